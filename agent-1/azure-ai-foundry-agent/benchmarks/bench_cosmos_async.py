@@ -0,0 +1,103 @@
+"""
+Async Cosmos DB Memory Benchmark
+Runs concurrent agent turns (read the recent turns, append two messages) inside one event loop,
+first with the synchronous CosmosDBMemory, whose calls block the loop, then with
+AsyncCosmosDBMemory. Also times warming up many users one at a time against
+AsyncCosmosDBMemory.warm_up, which batches the point reads into a single read_items call.
+
+Usage:
+    python benchmarks/bench_cosmos_async.py --users 50 --latency-ms 15
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fake_cosmos import AsyncFakeContainer, FakeContainer  # noqa: E402
+from memory.cosmosdb import AsyncCosmosDBMemory, CosmosDBMemory  # noqa: E402
+
+TURN = [{"role": "user", "content": "question"}, {"role": "assistant", "content": "answer"}]
+
+
+async def blocking_turns(args):
+    memory = CosmosDBMemory(None, write_behind=False, container=FakeContainer(args.latency_ms))
+
+    async def turn(user_id):
+        memory.retrieve_turns(user_id)
+        memory.append_turns(user_id, TURN)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[turn(f"user-{u}") for u in range(args.users)])
+    return (time.perf_counter() - start) * 1000
+
+
+async def async_turns(args):
+    memory = AsyncCosmosDBMemory(container=AsyncFakeContainer(args.latency_ms))
+
+    async def turn(user_id):
+        await memory.retrieve_turns(user_id)
+        await memory.append_turns(user_id, TURN)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[turn(f"user-{u}") for u in range(args.users)])
+    return (time.perf_counter() - start) * 1000
+
+
+async def seeded_container(args):
+    container = AsyncFakeContainer(args.latency_ms)
+    memory = AsyncCosmosDBMemory(container=container)
+    for u in range(args.users):
+        await memory.save_memory(f"user-{u}", {"preferences": u})
+        await memory.append_turns(f"user-{u}", TURN)
+    container.calls.clear()
+    return container
+
+
+async def warm_up_one_by_one(args):
+    container = await seeded_container(args)
+    memory = AsyncCosmosDBMemory(container=container)
+    start = time.perf_counter()
+    for u in range(args.users):
+        await memory.retrieve_memory(f"user-{u}")
+        await memory.retrieve_turns(f"user-{u}")
+    return (time.perf_counter() - start) * 1000, sum(container.calls.values())
+
+
+async def warm_up_batched(args):
+    container = await seeded_container(args)
+    memory = AsyncCosmosDBMemory(container=container)
+    start = time.perf_counter()
+    await memory.warm_up([f"user-{u}" for u in range(args.users)])
+    elapsed = (time.perf_counter() - start) * 1000
+    # Everything is now served locally
+    container.calls.clear()
+    for u in range(args.users):
+        await memory.retrieve_memory(f"user-{u}")
+        await memory.retrieve_turns(f"user-{u}")
+    assert not container.calls, container.calls
+    return elapsed, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=15.0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Async Cosmos memory benchmark: {args.users} users, {args.latency_ms:.0f}ms per call")
+    print("=" * 60)
+    print(f"   {args.users} concurrent turns, sync memory in the loop:  {asyncio.run(blocking_turns(args)):8.1f}ms")
+    print(f"   {args.users} concurrent turns, AsyncCosmosDBMemory:      {asyncio.run(async_turns(args)):8.1f}ms")
+    elapsed, calls = asyncio.run(warm_up_one_by_one(args))
+    print(f"   warm-up, one user at a time:                 {elapsed:8.1f}ms  ({calls} calls)")
+    elapsed, _ = asyncio.run(warm_up_batched(args))
+    print(f"   warm-up, read_items + concurrent windows:    {elapsed:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cosmos DB Memory Benchmark
+Compares per-turn latency of CosmosDBMemory with synchronous upserts against write-behind mode,
+and with and without the read-through cache, using an in-memory fake container with a fixed
+per-call latency. Each turn reads the user's memory and then writes it back, like Agent.process_input.
+A second run compares whole-document rewrites with the append-only turn log over one long conversation.
+
+Usage:
+    python benchmarks/bench_cosmos_memory.py --users 20 --turns 10 --latency-ms 15 --long-turns 400
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fake_cosmos import FakeContainer  # noqa: E402
+from memory.cosmosdb import CosmosDBMemory  # noqa: E402
+
+
+def run(name, write_behind, cache, args):
+    container = FakeContainer(args.latency_ms)
+    memory = CosmosDBMemory(None, write_behind=write_behind, container=container)
+    if not cache:
+        memory.cache_max_entries = 0
+    timings = []
+    for turn in range(args.turns):
+        for user in range(args.users):
+            start = time.perf_counter()
+            history = memory.retrieve_memory(f"user-{user}") or []
+            memory.save_memory(f"user-{user}", history + [{"role": "user", "content": f"turn {turn}"}])
+            timings.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    memory.close()
+    close_ms = (time.perf_counter() - start) * 1000
+    durable = all(len(container.items[(f"user-{u}", f"user-{u}")]['memory']) == args.turns for u in range(args.users))
+    print(f"   {name:<26} turn p50={statistics.median(timings):7.3f}ms  max={max(timings):7.2f}ms  "
+          f"reads={container.calls.get('read_item', 0):<4} upserts={container.calls.get('upsert_item', 0):<4} "
+          f"close={close_ms:6.1f}ms  all turns durable={durable}")
+
+
+def run_long(name, use_log, args):
+    container = FakeContainer(args.latency_ms)
+    memory = CosmosDBMemory(None, write_behind=False, container=container)
+    text = "x" * args.message_chars
+    checkpoints = {}
+    for turn in range(args.long_turns):
+        before = container.bytes_written
+        start = time.perf_counter()
+        if use_log:
+            memory.retrieve_turns("user")
+            memory.append_turns("user", [{"role": "user", "content": text}, {"role": "assistant", "content": text}])
+        else:
+            history = memory.retrieve_memory("user") or []
+            memory.save_memory("user", history + [{"role": "user", "content": text},
+                                                  {"role": "assistant", "content": text}])
+        if turn + 1 in (10, args.long_turns // 2, args.long_turns):
+            checkpoints[turn + 1] = (container.bytes_written - before, (time.perf_counter() - start) * 1000)
+    summary = "  ".join(f"turn {turn}: {size / 1024:7.1f}KB {ms:5.1f}ms" for turn, (size, ms) in checkpoints.items())
+    print(f"   {name:<26} written per turn  {summary}  total={container.bytes_written / 1024 / 1024:6.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--turns', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=15.0)
+    parser.add_argument('--long-turns', type=int, default=400)
+    parser.add_argument('--message-chars', type=int, default=500)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Cosmos memory benchmark: {args.users} users x {args.turns} turns, {args.latency_ms:.0f}ms per call")
+    print("=" * 60)
+    run("synchronous, no cache", False, False, args)
+    run("synchronous + cache", False, True, args)
+    run("write-behind + cache", True, True, args)
+
+    print(f"\nOne conversation of {args.long_turns} turns, {args.message_chars}-character messages:")
+    run_long("whole document rewrite", False, args)
+    run_long("append-only turn log", True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Embedding Client Benchmark
+Compares one request per text against EmbeddingClient's coalesced, deduplicated batches.
+
+Worker threads each embed queries drawn from a small pool, so concurrent and repeated texts are
+common, as with query-time vectorization under load. The fake endpoint charges a fixed latency
+per request plus a small cost per input.
+
+Usage:
+    python benchmarks/bench_embeddings.py --threads 32 --requests 20 --latency-ms 60
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.embeddings import EmbeddingClient  # noqa: E402
+
+
+class FakeEmbeddingEndpoint:
+    def __init__(self, latency_ms, dimensions=1024):
+        self.latency = latency_ms / 1000
+        self.dimensions = dimensions
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.requests += 1
+        time.sleep(self.latency + 0.0002 * len(texts))
+        return [[float(len(text))] * self.dimensions for text in texts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20, help='texts embedded per thread')
+    parser.add_argument('--distinct', type=int, default=200, help='size of the query pool')
+    parser.add_argument('--latency-ms', type=float, default=60.0)
+    parser.add_argument('--window-ms', type=float, default=10.0)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    pool = [f"question {i} about the earth at night" for i in range(args.distinct)]
+    workloads = [[rng.choice(pool) for _ in range(args.requests)] for _ in range(args.threads)]
+    total = args.threads * args.requests
+
+    print("=" * 60)
+    print(f"Embedding benchmark: {args.threads} threads x {args.requests} texts, {args.latency_ms:.0f}ms per request")
+    print("=" * 60)
+
+    for name, make_embed in (
+        ("one request per text", lambda endpoint: (lambda text: endpoint([text])[0])),
+        ("coalesced + cached", lambda endpoint: EmbeddingClient(create=endpoint, window_ms=args.window_ms,
+                                                                  api_key='unused').embed),
+    ):
+        endpoint = FakeEmbeddingEndpoint(args.latency_ms)
+        embed = make_embed(endpoint)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            list(executor.map(lambda texts: [embed(text) for text in texts], workloads))
+        elapsed = time.perf_counter() - start
+        print(f"   {name:<22} requests={endpoint.requests:<5} texts={total:<5} "
+              f"wall={elapsed:.2f}s  throughput={total / elapsed:.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
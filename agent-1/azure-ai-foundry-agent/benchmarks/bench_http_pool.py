@@ -0,0 +1,95 @@
+"""
+HTTP Pool Benchmark
+Compares per-call ``requests.get`` against the shared keep-alive pool using a local stub server.
+
+The stub server sleeps for ``--handshake-ms`` whenever a new connection is accepted to stand in
+for the TCP+TLS setup cost of a real Azure Search / GitHub endpoint.
+
+Usage:
+    python benchmarks/bench_http_pool.py --requests 200 --handshake-ms 40
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import requests  # noqa: E402
+
+from transport.http_pool import HTTPPool  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    handshake_delay = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; avoid Nagle stalls on kept-alive sockets
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with StubHandler.lock:
+            StubHandler.connections += 1
+        time.sleep(self.handshake_delay)
+
+    def do_GET(self):
+        body = b'{"value": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_case(name, fetch, url, count):
+    StubHandler.connections = 0
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fetch(url).raise_for_status()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"   {name:<22} p50={p50:7.2f}ms  p95={p95:7.2f}ms  connections={StubHandler.connections}")
+    return p50
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--handshake-ms', type=float, default=40.0)
+    args = parser.parse_args()
+
+    StubHandler.handshake_delay = args.handshake_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/indexes/demo/docs/search"
+
+    print("=" * 60)
+    print(f"HTTP pool benchmark: {args.requests} requests, {args.handshake_ms:.0f}ms simulated handshake")
+    print("=" * 60)
+
+    pool = HTTPPool()
+    try:
+        unpooled = run_case("requests.get (no pool)", requests.get, url, args.requests)
+        pooled = run_case("HTTPPool keep-alive", pool.get, url, args.requests)
+    finally:
+        pool.close()
+        server.shutdown()
+
+    print(f"\n   p50 saved per call: {unpooled - pooled:.2f}ms ({unpooled / max(pooled, 1e-6):.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
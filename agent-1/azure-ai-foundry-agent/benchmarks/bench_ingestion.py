@@ -0,0 +1,96 @@
+"""
+Incremental Ingestion Benchmark
+Counts embedding calls and uploaded chunks for a full ingest, an unchanged re-run and a re-run
+after editing a fraction of the documents, using an in-memory stand-in for the search index.
+
+Usage:
+    python benchmarks/bench_ingestion.py --documents 200 --edit-fraction 0.1
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from rag.ingestion import IngestionManifest, IngestionPipeline  # noqa: E402
+
+
+class FakeIndex:
+    """Stands in for AzureSearch.index_documents with a fixed per-batch latency."""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.documents = {}
+
+    def index_documents(self, actions):
+        time.sleep(self.latency)
+        for action in actions:
+            if action['@search.action'] == 'delete':
+                self.documents.pop(action['chunk_id'], None)
+            else:
+                self.documents[action['chunk_id']] = action
+        return [{'key': action['chunk_id'], 'status': True, 'statusCode': 200} for action in actions]
+
+
+class CountingEmbedder:
+    def __init__(self, latency_ms_per_text):
+        self.latency = latency_ms_per_text / 1000
+        self.texts = 0
+
+    def __call__(self, texts):
+        self.texts += len(texts)
+        time.sleep(self.latency * len(texts))
+        return [[0.0] * 8 for _ in texts]
+
+
+def make_documents(count, rng):
+    words = [''.join(rng.choice('abcdefghij') for _ in range(6)) for _ in range(5000)]
+    return [{'parent_id': f'earth_at_night_{i}.pdf', 'title': f'earth_at_night_{i}.pdf',
+             'content': '. '.join(' '.join(rng.choice(words) for _ in range(12)) for _ in range(120))}
+            for i in range(count)]
+
+
+def run(name, index, manifest_path, documents, args):
+    embedder = CountingEmbedder(args.embed_ms)
+    pipeline = IngestionPipeline(index, IngestionManifest(manifest_path), embed_batch=embedder,
+                                 batch_size=args.batch_size)
+    start = time.perf_counter()
+    stats = pipeline.run(documents)
+    print(f"   {name:<22} embedded={embedder.texts:<5} uploaded={stats['chunks_uploaded']:<5} "
+          f"deleted={stats['chunks_deleted']:<4} batches={stats['batches']:<4} wall={time.perf_counter() - start:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--edit-fraction', type=float, default=0.1)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--embed-ms', type=float, default=1.0)
+    parser.add_argument('--upload-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    documents = make_documents(args.documents, rng)
+
+    print("=" * 60)
+    print(f"Ingestion benchmark: {args.documents} documents, batch size {args.batch_size}")
+    print("=" * 60)
+
+    index = FakeIndex(args.upload_ms)
+    with tempfile.TemporaryDirectory() as directory:
+        manifest_path = os.path.join(directory, 'manifest.json')
+        run("initial ingest", index, manifest_path, documents, args)
+        run("unchanged re-run", index, manifest_path, documents, args)
+
+        for document in rng.sample(documents, int(len(documents) * args.edit_fraction)):
+            document['content'] += ' Updated paragraph about city lights.'
+        run(f"{args.edit_fraction:.0%} documents edited", index, manifest_path, documents, args)
+    print(f"   index holds {len(index.documents)} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Memory Backend Benchmark
+Runs the same agent turns (read the recent turns, append a user and an assistant message)
+against CosmosDBMemory on the in-memory Cosmos stand-in, with a fixed per-call latency, and
+against SQLiteMemory on a temporary file. Also times SQLiteMemory bulk load and export.
+
+Usage:
+    python benchmarks/bench_memory_backends.py --users 20 --turns 20 --latency-ms 15
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fake_cosmos import FakeContainer  # noqa: E402
+from memory.cosmosdb import CosmosDBMemory  # noqa: E402
+from memory.sqlite import SQLiteMemory  # noqa: E402
+
+
+def run(name, memory, args):
+    text = "x" * args.message_chars
+    timings = []
+    for turn in range(args.turns):
+        for user in range(args.users):
+            start = time.perf_counter()
+            memory.retrieve_turns(f"user-{user}")
+            memory.append_turns(f"user-{user}", [{"role": "user", "content": text},
+                                                 {"role": "assistant", "content": text}])
+            timings.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    memory.close()
+    close_ms = (time.perf_counter() - start) * 1000
+    timings.sort()
+    print(f"   {name:<32} turn p50={statistics.median(timings):7.3f}ms  "
+          f"p99={timings[int(len(timings) * 0.99) - 1]:7.3f}ms  close={close_ms:6.1f}ms")
+
+
+def bulk(directory, args):
+    source = SQLiteMemory(os.path.join(directory, 'export.db'))
+    for user in range(args.users):
+        source.save_memory(f"user-{user}", {"preferences": user})
+        source.append_turns(f"user-{user}", [{"role": "user", "content": "x" * args.message_chars}] * args.turns)
+    start = time.perf_counter()
+    items = list(source.export_items())
+    export_ms = (time.perf_counter() - start) * 1000
+
+    target = SQLiteMemory(os.path.join(directory, 'import.db'))
+    start = time.perf_counter()
+    loaded = target.bulk_load(items)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"   sqlite export {len(items)} items: {export_ms:7.1f}ms   bulk_load {loaded} items: {load_ms:7.1f}ms")
+    source.close()
+    target.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=15.0)
+    parser.add_argument('--message-chars', type=int, default=500)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Memory backend benchmark: {args.users} users x {args.turns} turns, "
+          f"Cosmos stand-in at {args.latency_ms:.0f}ms per call")
+    print("=" * 60)
+    run("cosmos, synchronous", CosmosDBMemory(None, write_behind=False, container=FakeContainer(args.latency_ms)),
+        args)
+    run("cosmos, write-behind", CosmosDBMemory(None, write_behind=True, container=FakeContainer(args.latency_ms)),
+        args)
+    with tempfile.TemporaryDirectory() as directory:
+        run("sqlite, WAL, synchronous=NORMAL", SQLiteMemory(os.path.join(directory, 'normal.db')), args)
+        run("sqlite, WAL, synchronous=FULL", SQLiteMemory(os.path.join(directory, 'full.db'), synchronous='FULL'),
+            args)
+        bulk(directory, args)
+
+
+if __name__ == "__main__":
+    main()
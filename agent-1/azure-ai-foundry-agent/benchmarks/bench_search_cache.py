@@ -0,0 +1,97 @@
+"""
+Search Cache Benchmark
+Measures hit rate and latency saved by SearchResultCache against a local fake search backend.
+
+The workload replays a set of questions with the kind of repetition seen in real sessions:
+exact repeats, case/whitespace/punctuation variants and lightly reworded near-duplicates.
+The similarity tier uses a toy hashed bag-of-words embedding so no model is needed.
+
+Usage:
+    python benchmarks/bench_search_cache.py --latency-ms 80 --rounds 3
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from rag.search_cache import CachedSearch, SearchResultCache  # noqa: E402
+
+QUESTIONS = [
+    "What's the NASA earth book about?",
+    "Are there any cloud formations specific to oceans and large bodies of water?",
+    "How do hurricanes form over the Atlantic?",
+    "What does the Sahara look like from orbit?",
+    "Which cities are visible at night from space?",
+    "How are glaciers changing in Patagonia?",
+]
+
+VARIANTS = [
+    lambda q: q,
+    lambda q: q.lower(),
+    lambda q: "  " + q.upper() + "  ",
+    lambda q: q.rstrip("?") + "??",
+    lambda q: q.replace("What's", "What is").replace("How are", "How is"),
+    lambda q: "please tell me " + q.lower(),
+]
+
+
+class FakeSearchBackend:
+    """Stands in for AzureSearch with a fixed per-query latency."""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    def search_documents(self, search_text, top=10):
+        self.calls += 1
+        time.sleep(self.latency)
+        return [{"chunk_id": f"{abs(hash(search_text)) % 1000}-{i}", "chunk": search_text} for i in range(top)]
+
+
+def toy_embedding(text, dimensions=256):
+    vector = [0.0] * dimensions
+    for word in text.replace("'", " ").split():
+        vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % dimensions] += 1.0
+    return vector
+
+
+def run(name, cache, latency_ms, workload):
+    backend = FakeSearchBackend(latency_ms)
+    search = CachedSearch(backend, cache)
+    start = time.perf_counter()
+    for query in workload:
+        search.search_documents(query, top=5)
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+    print(f"   {name:<20} hit rate={stats['hit_rate']:.0%}  exact={stats['exact_hits']:<3} "
+          f"semantic={stats['semantic_hits']:<3} backend calls={backend.calls:<3} "
+          f"saved={stats['saved_ms'] / 1000:.2f}s  wall={elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    workload = [rng.choice(VARIANTS)(q) for _ in range(args.rounds) for q in QUESTIONS for _ in range(2)]
+    rng.shuffle(workload)
+
+    print("=" * 60)
+    print(f"Search cache benchmark: {len(workload)} queries, {args.latency_ms:.0f}ms backend latency")
+    print("=" * 60)
+
+    run("exact tier only", SearchResultCache(ttl=300), args.latency_ms, workload)
+    run("exact + similarity", SearchResultCache(ttl=300, embed=toy_embedding, similarity_threshold=args.threshold),
+        args.latency_ms, workload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Streaming Benchmark
+Compares time-to-first-token with the time to the full completion for GPT4OModel.stream_response
+against a local stub of the chat completions endpoint, and counts new connections across calls.
+
+The stub emits ``--tokens`` server-sent events at ``--tokens-per-second`` after ``--queue-ms``
+of simulated queueing/prefill time. Needs openai==0.27.0 (pinned in requirements.txt); with another
+version the import of models.gpt4o fails with an ImportError that says so.
+
+Usage:
+    python benchmarks/bench_streaming.py --calls 5 --tokens 200 --tokens-per-second 80
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from config.settings import Config  # noqa: E402
+from models.gpt4o import GPT4OModel  # noqa: E402
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    tokens = 200
+    interval = 0.0125
+    queue_delay = 0.3
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        StubChatHandler.connections += 1
+
+    def _event(self, payload):
+        data = f"data: {payload}\n\n".encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        time.sleep(self.queue_delay)
+        for i in range(self.tokens):
+            chunk = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": f"tok{i} "}}]}
+            self._event(json.dumps(chunk))
+            time.sleep(self.interval)
+        self._event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=5)
+    parser.add_argument('--tokens', type=int, default=200)
+    parser.add_argument('--tokens-per-second', type=float, default=80.0)
+    parser.add_argument('--queue-ms', type=float, default=300.0)
+    args = parser.parse_args()
+
+    StubChatHandler.tokens = args.tokens
+    StubChatHandler.interval = 1 / args.tokens_per_second
+    StubChatHandler.queue_delay = args.queue_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Config.GPT4O_API_TYPE = 'open_ai'
+    Config.GPT4O_API_BASE = f"http://127.0.0.1:{server.server_port}/v1"
+
+    print("=" * 60)
+    print(f"Streaming benchmark: {args.calls} calls x {args.tokens} tokens at {args.tokens_per_second:.0f} tok/s")
+    print("=" * 60)
+
+    model = GPT4OModel('gpt-4o', api_key='unused')
+    for call in range(args.calls):
+        for _ in model.stream_response("Describe the earth at night."):
+            pass
+        metrics = model.last_metrics
+        print(f"   call {call + 1}: first token {metrics['ttft_ms']:7.1f}ms   full completion {metrics['total_ms']:7.1f}ms   "
+              f"{metrics['tokens_per_second']} tok/s")
+    print(f"   connections opened: {StubChatHandler.connections}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Cosmos DB Memory Checks
+Assert-based checks of CosmosDBMemory's durability and turn-log behaviour against the in-memory
+fake container, so no Azure resources are needed. Each check raises AssertionError on failure;
+the script exits non-zero if any check fails.
+
+Covers flush on close(), the flush at interpreter exit when close() is never called, turn
+renumbering after a sequence-number conflict between two writers (synchronous and write-behind),
+a synchronous append that fails part-way, and compaction into the summary item.
+
+Usage:
+    python benchmarks/check_cosmos_memory.py
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from fake_cosmos import FakeContainer  # noqa: E402
+from memory.cosmosdb import CosmosDBMemory  # noqa: E402
+
+
+def turn(content, role="user"):
+    return {"role": role, "content": content}
+
+
+def stored_turns(container, user_id):
+    """(seq, content) of every turn item in the user's partition, in sequence order."""
+    return sorted((item['seq'], item['content']) for (pk, _), item in container.items.items()
+                  if pk == user_id and item.get('type') == 'turn')
+
+
+def check_flush_on_close():
+    container = FakeContainer(latency_ms=0)
+    memory = CosmosDBMemory(None, write_behind=True, container=container)
+    memory.flush_interval = 60
+    memory.save_memory("alice", {"name": "Alice"})
+    memory.append_turns("alice", [turn("hello"), turn("hi", "assistant")])
+    assert not container.items, "write-behind wrote before the flush interval"
+    memory.close()
+    assert container.items[("alice", "alice")]['memory'] == {"name": "Alice"}
+    assert stored_turns(container, "alice") == [(0, "hello"), (1, "hi")]
+
+
+def check_flush_at_exit():
+    # The hook that prints the container is registered first, so atexit runs it last
+    script = textwrap.dedent(f"""
+        import atexit, json, sys
+        sys.path[:0] = [{BENCH_DIR!r}, {SRC_DIR!r}]
+        from fake_cosmos import FakeContainer
+        from memory.cosmosdb import CosmosDBMemory
+
+        container = FakeContainer(latency_ms=0)
+        atexit.register(lambda: print(json.dumps(sorted(item_id for _, item_id in container.items))))
+        memory = CosmosDBMemory(None, write_behind=True, container=container)
+        memory.flush_interval = 60
+        memory.save_memory("bob", {{"name": "Bob"}})
+        memory.append_turns("bob", [{{"role": "user", "content": "bye"}}])
+    """)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert "Traceback" not in result.stderr, result.stderr
+    persisted = result.stdout.strip().splitlines()[-1]
+    assert persisted == '["bob", "bob:0000000000"]', f"persisted at exit: {persisted}"
+
+
+def check_conflict_renumbering(write_behind):
+    container = FakeContainer(latency_ms=0)
+    first = CosmosDBMemory(None, write_behind=False, container=container)
+    second = CosmosDBMemory(None, write_behind=write_behind, container=container)
+    # Both replicas load the empty log, so both start numbering at 0
+    assert first.retrieve_turns("carol") == [] and second.retrieve_turns("carol") == []
+    first.append_turns("carol", [turn("a1"), turn("a2")])
+    second.append_turns("carol", [turn("b1"), turn("b2"), turn("b3")])
+    second.flush()
+    assert stored_turns(container, "carol") == [(0, "a1"), (1, "a2"), (2, "b1"), (3, "b2"), (4, "b3")], \
+        stored_turns(container, "carol")
+    assert second.stats()['conflicts'] > 0
+    # The renumbered writer reloads its window and continues after the other writer's turns
+    assert [message['content'] for message in second.retrieve_turns("carol")] == ["a1", "a2", "b1", "b2", "b3"]
+    second.append_turns("carol", [turn("b4")])
+    second.flush()
+    assert stored_turns(container, "carol")[-1] == (5, "b4")
+    second.close()
+
+
+class FailingCreateContainer(FakeContainer):
+    """Fails create_item with a 503 for items whose content is in ``fail_contents``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_contents = set()
+
+    def create_item(self, body, **kwargs):
+        if body.get('content') in self.fail_contents:
+            error = Exception("Service unavailable")
+            error.status_code = 503
+            raise error
+        return super().create_item(body, **kwargs)
+
+
+def check_failed_append():
+    container = FailingCreateContainer(latency_ms=0)
+    memory = CosmosDBMemory(None, write_behind=False, container=container)
+    memory.append_turns("erin", [turn("e1")])
+    container.fail_contents.add("e3")
+    try:
+        memory.append_turns("erin", [turn("e2"), turn("e3")])
+    except Exception as e:
+        assert getattr(e, 'status_code', None) == 503, e
+    else:
+        raise AssertionError("append_turns did not raise")
+    # e2 was created before e3 failed; e3 was never persisted, so it is not served either
+    assert [message['content'] for message in memory.retrieve_turns("erin")] == ["e1", "e2"]
+    container.fail_contents.clear()
+    memory.append_turns("erin", [turn("e4")])
+    assert stored_turns(container, "erin") == [(0, "e1"), (1, "e2"), (2, "e4")], stored_turns(container, "erin")
+    assert [message['content'] for message in memory.retrieve_turns("erin")] == ["e1", "e2", "e4"]
+
+
+def check_compaction():
+    container = FakeContainer(latency_ms=0)
+    memory = CosmosDBMemory(None, write_behind=False, container=container)
+    memory.compact_after = 10
+    memory.compact_keep = 4
+    memory.append_turns("dave", [turn(f"m{i}") for i in range(12)])
+    # The log passed compact_after, so the compactor thread folds all but the last 4 turns
+    memory._compactor.join()
+    summary = container.items[("dave", "dave:summary")]
+    assert summary['through_seq'] == 7, summary
+    assert summary['summary'].splitlines() == [f"user: m{i}" for i in range(8)], summary['summary']
+    assert stored_turns(container, "dave") == [(seq, f"m{seq}") for seq in range(8, 12)]
+    messages = memory.retrieve_turns("dave")
+    assert messages[0]['role'] == 'system' and [m['content'] for m in messages[1:]] == [f"m{i}" for i in range(8, 12)]
+    assert memory.compact("dave", keep_last=2) == 2
+    assert stored_turns(container, "dave") == [(10, "m10"), (11, "m11")]
+    assert memory.stats()['log']['compacted_turns'] == 10
+
+
+CHECKS = [
+    ("flush on close", check_flush_on_close),
+    ("flush at exit without close", check_flush_at_exit),
+    ("conflict renumbering (synchronous)", lambda: check_conflict_renumbering(write_behind=False)),
+    ("conflict renumbering (write-behind)", lambda: check_conflict_renumbering(write_behind=True)),
+    ("failed synchronous append is not served", check_failed_append),
+    ("compaction", check_compaction),
+]
+
+
+def main():
+    print("=" * 60)
+    print("CosmosDBMemory checks (fake container)")
+    print("=" * 60)
+    failed = 0
+    for name, check in CHECKS:
+        try:
+            check()
+        except AssertionError as e:
+            failed += 1
+            print(f"   FAIL  {name}: {e}")
+        else:
+            print(f"   ok    {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+In-memory stand-in for an azure.cosmos ContainerProxy, used by the memory benchmarks.
+
+Each call sleeps for a fixed latency and is counted, and items get an ``_etag`` that changes on
+every write, like the real service. ``bytes_written`` totals the JSON size of every write, the
+main driver of request-unit cost.
+"""
+
+import asyncio
+import copy
+import json
+import threading
+import time
+import uuid
+
+
+class CosmosResourceNotFoundError(Exception):
+    status_code = 404
+
+
+class CosmosResourceExistsError(Exception):
+    status_code = 409
+
+
+class FakeContainer:
+    def __init__(self, latency_ms=10.0, partition_key='partitionKey'):
+        self.latency = latency_ms / 1000
+        self.partition_key = partition_key
+        self.items = {}
+        self.calls = {}
+        self.bytes_written = 0
+        self.lock = threading.Lock()
+
+    def _call(self, name):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        time.sleep(self.latency)
+
+    def _stored(self, item):
+        with self.lock:
+            self.bytes_written += len(json.dumps(item))
+        item = copy.deepcopy(item)
+        item['_etag'] = f'"{uuid.uuid4()}"'
+        item['_ts'] = int(time.time())
+        return item
+
+    def upsert_item(self, body, **kwargs):
+        self._call('upsert_item')
+        item = self._stored(body)
+        with self.lock:
+            self.items[(body[self.partition_key], body['id'])] = item
+        return copy.deepcopy(item)
+
+    def create_item(self, body, **kwargs):
+        self._call('create_item')
+        key = (body[self.partition_key], body['id'])
+        item = self._stored(body)
+        with self.lock:
+            if key in self.items:
+                raise CosmosResourceExistsError(f"Entity with the specified id already exists: {body['id']}")
+            self.items[key] = item
+        return copy.deepcopy(item)
+
+    def read_item(self, item, partition_key, **kwargs):
+        self._call('read_item')
+        with self.lock:
+            stored = self.items.get((partition_key, item))
+        if stored is None:
+            raise CosmosResourceNotFoundError(f"Entity with the specified id does not exist: {item}")
+        if kwargs.get('if_none_match') == stored['_etag']:
+            # The SDK returns an empty result for 304 Not Modified
+            return None
+        return copy.deepcopy(stored)
+
+    def read_items(self, items, **kwargs):
+        # One call for many (id, partition key) pairs; missing items are left out
+        self._call('read_items')
+        with self.lock:
+            return [copy.deepcopy(self.items[(pk, item_id)]) for item_id, pk in items
+                    if (pk, item_id) in self.items]
+
+    def delete_item(self, item, partition_key, **kwargs):
+        self._call('delete_item')
+        with self.lock:
+            if self.items.pop((partition_key, item), None) is None:
+                raise CosmosResourceNotFoundError(f"Entity with the specified id does not exist: {item}")
+
+    def query_items(self, query, parameters=None, partition_key=None, **kwargs):
+        # The SQL text is not parsed. Items are filtered on the parameters the memory queries use
+        # (@type, @after and @before on seq), ordered by seq (DESC if the query says so) and cut to @n.
+        self._call('query_items')
+        params = {p['name']: p['value'] for p in parameters or []}
+        with self.lock:
+            items = [copy.deepcopy(item) for (pk, _), item in sorted(self.items.items())
+                     if partition_key is None or pk == partition_key]
+        if '@type' in params:
+            items = [item for item in items if item.get('type') == params['@type']]
+        if '@after' in params:
+            items = [item for item in items if item['seq'] > params['@after']]
+        if '@before' in params:
+            items = [item for item in items if item['seq'] < params['@before']]
+        if '@type' in params:
+            items.sort(key=lambda item: item['seq'], reverse='DESC' in query)
+        if '@n' in params:
+            items = items[:params['@n']]
+        return iter(items)
+
+
+class AsyncFakeContainer(FakeContainer):
+    """Awaitable variant, like the azure.cosmos.aio ContainerProxy: latency is an asyncio sleep."""
+
+    def _call(self, name):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    async def _wait(self):
+        await asyncio.sleep(self.latency)
+
+    async def upsert_item(self, body, **kwargs):
+        await self._wait()
+        return super().upsert_item(body, **kwargs)
+
+    async def create_item(self, body, **kwargs):
+        await self._wait()
+        return super().create_item(body, **kwargs)
+
+    async def read_item(self, item, partition_key, **kwargs):
+        await self._wait()
+        return super().read_item(item, partition_key, **kwargs)
+
+    async def read_items(self, items, **kwargs):
+        await self._wait()
+        return super().read_items(items, **kwargs)
+
+    async def delete_item(self, item, partition_key, **kwargs):
+        await self._wait()
+        return super().delete_item(item, partition_key, **kwargs)
+
+    async def query_items(self, query, parameters=None, partition_key=None, **kwargs):
+        # An async iterator, not a coroutine, as in the aio SDK
+        await self._wait()
+        for item in super().query_items(query, parameters=parameters, partition_key=partition_key, **kwargs):
+            yield item
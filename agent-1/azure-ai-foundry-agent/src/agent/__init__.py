@@ -1,14 +1,35 @@
+from agent.context_budget import ContextBudget
+from config.settings import Config
+
+
 class Agent:
-    def __init__(self):
+    def __init__(self, memory=None, tools=None, model=None, search=None, budget=None):
         # Initialize the agent and its components
-        self.memory = None  # Placeholder for memory component
-        self.tools = None   # Placeholder for tools component
-        self.model = None   # Placeholder for model component
+        self.memory = memory
+        self.tools = tools
+        self.model = model
+        self.search = search
+        # Keeps the prompt size flat however long the session gets
+        self.budget = budget or ContextBudget()
+        self.last_budget_report = None
 
     def run(self):
         # Start the agent's operations
         pass
 
-    def process_input(self, user_input):
+    def process_input(self, user_input, user_id="default"):
         # Handle user inputs and interact with the model and memory
-        pass
\ No newline at end of file
+        # Only the recent window (plus the summary of compacted turns) is read, however long the session
+        history = self.memory.retrieve_turns(user_id) if self.memory else []
+        documents = self.search.search_documents(user_input, top=Config.RAG_TOP) if self.search else []
+
+        prompt = self.budget.build(user_input, history=history, documents=documents)
+        self.last_budget_report = prompt.report
+        response = self.model.generate_response(prompt.messages)
+
+        if self.memory:
+            self.memory.append_turns(user_id, [
+                {"role": "user", "content": user_input},
+                {"role": "assistant", "content": response},
+            ])
+        return response
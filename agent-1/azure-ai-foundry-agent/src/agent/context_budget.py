@@ -0,0 +1,164 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from config.settings import Config
+
+try:
+    import tiktoken
+except ImportError:  # Optional: counts fall back to a characters-per-token estimate
+    tiktoken = None
+
+# Chat formatting adds a few tokens per message on top of its content
+MESSAGE_OVERHEAD = 4
+SOURCE_SEPARATOR = "=================\n"
+
+GROUNDED_PROMPT = """You are an AI assistant that helps users learn from the information found in the source material.
+Answer the query using only the sources provided below.
+Use bullets if the answer has multiple points.
+If the answer is longer than 3 sentences, provide a summary.
+Answer ONLY with the facts listed in the list of sources below. Cite your source when you answer the question
+If there isn't enough information below, say you don't know.
+Do not generate answers that don't use the sources below.
+Sources:
+{sources}"""
+
+# messages: chat messages ready for the model; report: what was kept, truncated and dropped
+BudgetedPrompt = namedtuple('BudgetedPrompt', ['messages', 'report'])
+
+
+class TokenCounter:
+    """Token counts with the encoding loaded once and per-text counts memoized.
+
+    History and system text are re-counted on every turn, so the cache turns most
+    counts into dictionary lookups.
+    """
+
+    def __init__(self, model=None, cache_size=4096):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model or Config.GPT4O_MODEL_NAME)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding('cl100k_base')
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text):
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def truncate(self, text, max_tokens):
+        if max_tokens <= 0:
+            return ''
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
+        return text[:max_tokens * 4]
+
+
+class ContextBudget:
+    """Fits system prompt, retrieved chunks, history and the user input into a fixed token budget.
+
+    The user input and system prompt are always kept. What remains is split between
+    retrieved chunks (best search score first) and history (newest turn first);
+    whatever one side does not use is given to the other. Items that do not fit
+    are dropped, except that the next chunk in line may be truncated when at least
+    ``min_chunk_tokens`` are left.
+    """
+
+    def __init__(self, max_tokens=None, response_tokens=None, history_share=None,
+                 min_chunk_tokens=64, counter=None):
+        self.max_tokens = max_tokens or Config.CONTEXT_MAX_TOKENS
+        self.response_tokens = Config.CONTEXT_RESPONSE_TOKENS if response_tokens is None else response_tokens
+        self.history_share = Config.CONTEXT_HISTORY_SHARE if history_share is None else history_share
+        self.min_chunk_tokens = min_chunk_tokens
+        self.counter = counter or TokenCounter()
+
+    def _message_tokens(self, content):
+        return self.counter.count(content) + MESSAGE_OVERHEAD
+
+    @staticmethod
+    def _format_document(document):
+        locations = document.get('locations')
+        text = f"TITLE: {document.get('title', '')}, CONTENT: {document.get('chunk', '')}"
+        return f"{text}, LOCATIONS: {locations}" if locations else text
+
+    def _truncate_to_fit(self, text, room):
+        # A decoded token prefix can re-encode longer (and the estimate rounds up), so shrink
+        # until the chunk plus its separator really fits in room
+        limit = room - self.counter.count(SOURCE_SEPARATOR)
+        text = self.counter.truncate(text, limit)
+        while text:
+            excess = self.counter.count(text + SOURCE_SEPARATOR) - room
+            if excess <= 0:
+                break
+            limit -= excess
+            text = self.counter.truncate(text, limit)
+        return text
+
+    def _fit_documents(self, documents, budget, report):
+        ranked = sorted(documents, key=lambda d: d.get('@search.score', 0), reverse=True)
+        sources, used = [], 0
+        for document in ranked:
+            text = self._format_document(document)
+            tokens = self.counter.count(text + SOURCE_SEPARATOR)
+            if used + tokens <= budget:
+                sources.append(text)
+                used += tokens
+            elif budget - used >= self.min_chunk_tokens and not report['documents_truncated']:
+                text = self._truncate_to_fit(text, budget - used)
+                if not text:
+                    report['documents_dropped'].append(document.get('chunk_id'))
+                    continue
+                sources.append(text)
+                used += self.counter.count(text + SOURCE_SEPARATOR)
+                report['documents_truncated'].append(document.get('chunk_id'))
+            else:
+                report['documents_dropped'].append(document.get('chunk_id'))
+        report['documents_kept'] = len(sources)
+        return sources, used
+
+    def _fit_history(self, history, budget, report):
+        kept, used = [], 0
+        for turn in reversed(history):
+            tokens = self._message_tokens(turn['content'])
+            if used + tokens > budget:
+                break
+            kept.append(turn)
+            used += tokens
+        report['history_kept'] = len(kept)
+        report['history_dropped'] = len(history) - len(kept)
+        return list(reversed(kept)), used
+
+    def build(self, user_input, history=None, documents=None, system_prompt=GROUNDED_PROMPT):
+        history, documents = history or [], documents or []
+        report = {'documents_truncated': [], 'documents_dropped': []}
+
+        available = self.max_tokens - self.response_tokens
+        user_tokens = self._message_tokens(user_input)
+        if user_tokens > available // 2:
+            # An oversized paste must not crowd out every source
+            user_input = self.counter.truncate(user_input, available // 2)
+            user_tokens = self._message_tokens(user_input)
+            report['user_input_truncated'] = True
+        fixed = user_tokens + self._message_tokens(system_prompt.format(sources=''))
+        remaining = max(available - fixed, 0)
+
+        history_budget = int(remaining * self.history_share)
+        history_needed = sum(self._message_tokens(turn['content']) for turn in history)
+        # Chunks get their share plus whatever history does not need, and vice versa
+        sources, documents_used = self._fit_documents(
+            documents, remaining - min(history_budget, history_needed), report)
+        kept_history, history_used = self._fit_history(history, remaining - documents_used, report)
+
+        messages = [{"role": "system", "content": system_prompt.format(sources=SOURCE_SEPARATOR.join(sources))}]
+        messages.extend({"role": turn['role'], "content": turn['content']} for turn in kept_history)
+        messages.append({"role": "user", "content": user_input})
+
+        report.update(
+            budget_tokens=available,
+            prompt_tokens=fixed + documents_used + history_used,
+            documents_tokens=documents_used,
+            history_tokens=history_used,
+        )
+        return BudgetedPrompt(messages, report)
@@ -6,21 +6,111 @@ class Config:
     # GPT-4o model settings
     GPT4O_MODEL_NAME = os.getenv('GPT4O_MODEL_NAME', 'gpt-4o')
     GPT4O_API_KEY = os.getenv('GPT4O_API_KEY')
+    # Set GPT4O_API_TYPE=azure with GPT4O_API_BASE/GPT4O_DEPLOYMENT for Azure OpenAI
+    GPT4O_API_TYPE = os.getenv('GPT4O_API_TYPE', 'open_ai')
+    GPT4O_API_BASE = os.getenv('GPT4O_API_BASE')
+    GPT4O_API_VERSION = os.getenv('GPT4O_API_VERSION', '2024-06-01')
+    GPT4O_DEPLOYMENT = os.getenv('GPT4O_DEPLOYMENT')
+
+    # Context budget applied before each model call (agent/context_budget.py)
+    CONTEXT_MAX_TOKENS = int(os.getenv('CONTEXT_MAX_TOKENS', '8000'))
+    CONTEXT_RESPONSE_TOKENS = int(os.getenv('CONTEXT_RESPONSE_TOKENS', '1000'))
+    CONTEXT_HISTORY_SHARE = float(os.getenv('CONTEXT_HISTORY_SHARE', '0.4'))
+    RAG_TOP = int(os.getenv('RAG_TOP', '5'))
+
+    # Response cache for deterministic prompts: off, memory or disk
+    RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'memory')
+    RESPONSE_CACHE_ONLY_DETERMINISTIC = os.getenv('RESPONSE_CACHE_ONLY_DETERMINISTIC', 'true').lower() == 'true'
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1024'))
+    RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR', '.response_cache')
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+    # Embedding settings (models/embeddings.py); dimensions match the tutorial index
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-large')
+    EMBEDDING_DEPLOYMENT = os.getenv('EMBEDDING_DEPLOYMENT')
+    EMBEDDING_API_KEY = os.getenv('EMBEDDING_API_KEY', os.getenv('GPT4O_API_KEY'))
+    # Endpoint settings default to the GPT-4o ones, so one Azure OpenAI resource serves both
+    EMBEDDING_API_TYPE = os.getenv('EMBEDDING_API_TYPE', GPT4O_API_TYPE)
+    EMBEDDING_API_BASE = os.getenv('EMBEDDING_API_BASE', GPT4O_API_BASE)
+    EMBEDDING_API_VERSION = os.getenv('EMBEDDING_API_VERSION', GPT4O_API_VERSION)
+    EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '1024'))
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '256'))
+    EMBEDDING_MAX_BATCH_TOKENS = int(os.getenv('EMBEDDING_MAX_BATCH_TOKENS', '100000'))
+    EMBEDDING_BATCH_WINDOW_MS = float(os.getenv('EMBEDDING_BATCH_WINDOW_MS', '10'))
+    EMBEDDING_MAX_INFLIGHT = int(os.getenv('EMBEDDING_MAX_INFLIGHT', '4'))
+    EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', '10000'))
 
     # Azure Search settings
     AZURE_SEARCH_ENDPOINT = os.getenv('AZURE_SEARCH_ENDPOINT')
     AZURE_SEARCH_API_KEY = os.getenv('AZURE_SEARCH_API_KEY')
     AZURE_SEARCH_INDEX_NAME = os.getenv('AZURE_SEARCH_INDEX_NAME')
+    # Comma-separated fields returned by default (unset = every retrievable non-vector field)
+    AZURE_SEARCH_SELECT = [f.strip() for f in os.getenv('AZURE_SEARCH_SELECT', '').split(',') if f.strip()]
+    AZURE_SEARCH_VECTOR_FIELDS = [f.strip() for f in os.getenv('AZURE_SEARCH_VECTOR_FIELDS', 'text_vector').split(',') if f.strip()]
+    # Retrieval mode: keyword, hybrid (keyword + vectorQueries) or vector
+    AZURE_SEARCH_MODE = os.getenv('AZURE_SEARCH_MODE', 'keyword')
+    AZURE_SEARCH_VECTOR_K = int(os.getenv('AZURE_SEARCH_VECTOR_K', '50'))
+    AZURE_SEARCH_EXHAUSTIVE = os.getenv('AZURE_SEARCH_EXHAUSTIVE', 'false').lower() == 'true'
+    AZURE_SEARCH_RERANK_TOP = int(os.getenv('AZURE_SEARCH_RERANK_TOP', '0'))
+    AZURE_SEARCH_STREAM_DECODE = os.getenv('AZURE_SEARCH_STREAM_DECODE', 'true').lower() == 'true'
+    SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', '300'))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '512'))
+    SEARCH_CACHE_SIMILARITY = float(os.getenv('SEARCH_CACHE_SIMILARITY', '0.95'))
+
+    # Incremental ingestion (rag/ingestion.py); chunk defaults match the tutorial's SplitSkill
+    INGEST_MANIFEST_PATH = os.getenv('INGEST_MANIFEST_PATH', '.ingest_manifest.json')
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', '100'))
+    INGEST_CHUNK_SIZE = int(os.getenv('INGEST_CHUNK_SIZE', '2000'))
+    INGEST_CHUNK_OVERLAP = int(os.getenv('INGEST_CHUNK_OVERLAP', '500'))
+
+    # Local vector index (rag/local_index.py) for offline retrieval
+    LOCAL_INDEX_PATH = os.getenv('LOCAL_INDEX_PATH')
+    LOCAL_INDEX_MMAP = os.getenv('LOCAL_INDEX_MMAP', 'true').lower() == 'true'
+    LOCAL_INDEX_NPROBE = int(os.getenv('LOCAL_INDEX_NPROBE', '8'))
 
     # Cosmos DB settings
     COSMOSDB_URI = os.getenv('COSMOSDB_URI')
     COSMOSDB_KEY = os.getenv('COSMOSDB_KEY')
-    COSMOSDB_DATABASE_NAME = os.getenv('COSMOSDB_DATABASE_NAME')
-    COSMOSDB_CONTAINER_NAME = os.getenv('COSMOSDB_CONTAINER_NAME')
+    COSMOSDB_DATABASE_NAME = os.getenv('COSMOSDB_DATABASE_NAME', 'AIFoundryDB')
+    COSMOSDB_CONTAINER_NAME = os.getenv('COSMOSDB_CONTAINER_NAME', 'MemoryContainer')
+    # Write-behind: memory updates are buffered per user and upserted in the background
+    COSMOSDB_WRITE_BEHIND = os.getenv('COSMOSDB_WRITE_BEHIND', 'true').lower() == 'true'
+    COSMOSDB_FLUSH_INTERVAL = float(os.getenv('COSMOSDB_FLUSH_INTERVAL', '2'))
+    COSMOSDB_FLUSH_MAX_ITEMS = int(os.getenv('COSMOSDB_FLUSH_MAX_ITEMS', '50'))
+    COSMOSDB_FLUSH_CONCURRENCY = int(os.getenv('COSMOSDB_FLUSH_CONCURRENCY', '4'))
+    # Read-through cache for retrieve_memory; stale entries are revalidated with If-None-Match
+    COSMOSDB_CACHE_TTL = float(os.getenv('COSMOSDB_CACHE_TTL', '30'))
+    COSMOSDB_CACHE_MAX_ENTRIES = int(os.getenv('COSMOSDB_CACHE_MAX_ENTRIES', '1024'))
+    # Append-only turn log: messages returned by retrieve_turns, and when old turns are folded into a summary
+    COSMOSDB_LOG_WINDOW = int(os.getenv('COSMOSDB_LOG_WINDOW', '20'))
+    COSMOSDB_COMPACT_AFTER = int(os.getenv('COSMOSDB_COMPACT_AFTER', '200'))
+    COSMOSDB_COMPACT_KEEP = int(os.getenv('COSMOSDB_COMPACT_KEEP', '50'))
+    COSMOSDB_SUMMARY_MAX_CHARS = int(os.getenv('COSMOSDB_SUMMARY_MAX_CHARS', '4000'))
+    # AsyncCosmosDBMemory.warm_up: concurrent turn-log queries when preloading many users
+    COSMOSDB_WARM_UP_CONCURRENCY = int(os.getenv('COSMOSDB_WARM_UP_CONCURRENCY', '8'))
+
+    # Memory backend (memory/backend.py build_memory): cosmos, sqlite or off.
+    # The SQLite store uses the COSMOSDB_LOG_WINDOW and COSMOSDB_COMPACT_* turn-log settings too.
+    MEMORY_BACKEND = os.getenv('MEMORY_BACKEND', 'cosmos')
+    MEMORY_SQLITE_PATH = os.getenv('MEMORY_SQLITE_PATH', 'memory.db')
+    # NORMAL is durable across application crashes in WAL mode; FULL also survives power loss
+    MEMORY_SQLITE_SYNCHRONOUS = os.getenv('MEMORY_SQLITE_SYNCHRONOUS', 'NORMAL')
 
     # GitHub MCP tool settings
     GITHUB_API_URL = os.getenv('GITHUB_API_URL')
     GITHUB_API_TOKEN = os.getenv('GITHUB_API_TOKEN')
+    GITHUB_ETAG_CACHE = os.getenv('GITHUB_ETAG_CACHE', 'true').lower() == 'true'
+    GITHUB_ETAG_CACHE_PATH = os.getenv('GITHUB_ETAG_CACHE_PATH')
+    # Seconds between writes of the ETag cache file; 0 writes on every change
+    GITHUB_ETAG_PERSIST_INTERVAL = float(os.getenv('GITHUB_ETAG_PERSIST_INTERVAL', '5'))
+
+    # HTTP connection pool settings shared by the Azure Search and GitHub clients
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))
+    HTTP_KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', 'true').lower() == 'true'
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
 
     @staticmethod
     def validate():
@@ -28,11 +118,11 @@ class Config:
             'GPT4O_API_KEY',
             'AZURE_SEARCH_ENDPOINT',
             'AZURE_SEARCH_API_KEY',
-            'COSMOSDB_URI',
-            'COSMOSDB_KEY',
             'GITHUB_API_URL',
             'GITHUB_API_TOKEN'
         ]
+        if Config.MEMORY_BACKEND == 'cosmos':
+            required_vars += ['COSMOSDB_URI', 'COSMOSDB_KEY']
         for var in required_vars:
             if not os.getenv(var):
                 raise ValueError(f'Missing required environment variable: {var}')
\ No newline at end of file
@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+
+from config.settings import Config
+
+
+def digest_summary(previous, turns, max_chars=None):
+    # Default compaction: keep the tail of a plain transcript, bounded to a fixed size
+    max_chars = max_chars or Config.COSMOSDB_SUMMARY_MAX_CHARS
+    lines = [previous] if previous else []
+    lines.extend(f"{turn['role']}: {turn['content']}" for turn in turns)
+    return "\n".join(lines)[-max_chars:]
+
+
+def summary_message(summary):
+    # How compacted turns are handed back to the agent, ahead of the recent window
+    return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+
+class MemoryBackend(ABC):
+    """What the agent needs from a memory store.
+
+    ``save_memory``/``retrieve_memory`` keep one document per user. The turn log keeps the
+    conversation: ``append_turns`` adds messages, ``retrieve_turns`` returns the last ones
+    (with the summary of compacted turns first), and ``compact`` folds old turns into that
+    summary. Stores without buffering or caching can keep the default ``flush``, ``close``,
+    ``invalidate`` and ``stats``.
+    """
+
+    @abstractmethod
+    def save_memory(self, user_id, memory_data):
+        raise NotImplementedError
+
+    @abstractmethod
+    def retrieve_memory(self, user_id, raise_errors=False):
+        raise NotImplementedError
+
+    @abstractmethod
+    def append_turns(self, user_id, turns):
+        raise NotImplementedError
+
+    @abstractmethod
+    def retrieve_turns(self, user_id, last_n=None, include_summary=True, raise_errors=False):
+        raise NotImplementedError
+
+    @abstractmethod
+    def compact(self, user_id, keep_last=None):
+        raise NotImplementedError
+
+    def invalidate(self, user_id=None):
+        pass
+
+    def flush(self):
+        return 0
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+def build_memory(**kwargs):
+    # MEMORY_BACKEND: cosmos, sqlite or off
+    if Config.MEMORY_BACKEND == 'sqlite':
+        from memory.sqlite import SQLiteMemory
+        return SQLiteMemory(**kwargs)
+    if Config.MEMORY_BACKEND == 'cosmos':
+        from memory.cosmosdb import CosmosDBMemory
+        return CosmosDBMemory(kwargs.pop('connection_string', None), **kwargs)
+    return None
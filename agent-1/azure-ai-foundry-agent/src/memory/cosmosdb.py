@@ -1,30 +1,886 @@
-class CosmosDBMemory:
-    def __init__(self, connection_string):
+import asyncio
+import atexit
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import Config
+from memory.backend import MemoryBackend, digest_summary, summary_message
+
+
+# Windowed read of the turn log, newest first; seq > @after skips turns already folded into the summary
+LAST_TURNS_QUERY = ("SELECT TOP @n * FROM c WHERE c.type = @type AND c.seq > @after "
+                    "ORDER BY c.seq DESC")
+TURN_RANGE_QUERY = ("SELECT * FROM c WHERE c.type = @type AND c.seq > @after AND c.seq < @before "
+                    "ORDER BY c.seq ASC")
+
+
+class CosmosDBMemory(MemoryBackend):
+    # Renumber-and-retry rounds when another writer already took a turn's sequence number
+    TURN_CONFLICT_RETRIES = 3
+
+    def __init__(self, connection_string, write_behind=None, container=None, summarize=None):
         self.connection_string = connection_string
-        self.client = self._initialize_cosmos_client()
-        self.database_name = "AIFoundryDB"
-        self.container_name = "MemoryContainer"
-        self.container = self._get_container()
+        self.database_name = Config.COSMOSDB_DATABASE_NAME
+        self.container_name = Config.COSMOSDB_CONTAINER_NAME
+        if container is None:
+            self.client = self._initialize_cosmos_client()
+            container = self._get_container()
+        self.container = container
+
+        # Write-behind: save_memory only buffers; a background thread upserts the latest item per user
+        self.write_behind = Config.COSMOSDB_WRITE_BEHIND if write_behind is None else write_behind
+        self.flush_interval = Config.COSMOSDB_FLUSH_INTERVAL
+        self.flush_max_items = Config.COSMOSDB_FLUSH_MAX_ITEMS
+        self._pending = {}
+        self._inflight = {}
+        self._oldest_pending = None
+        self._cond = threading.Condition()
+        # Serializes flushes, so flush() also waits for a background flush already in flight
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._flusher = None
+        # Set for the final flush at exit, when the executor no longer accepts work
+        self._serial = False
+        self.writes = 0
+        self.coalesced = 0
+        self.upserts = 0
+        self.failures = 0
+        self.conflicts = 0
+
+        # Read-through cache: fresh entries are served locally, stale ones revalidated by ETag
+        self.cache_ttl = Config.COSMOSDB_CACHE_TTL
+        self.cache_max_entries = Config.COSMOSDB_CACHE_MAX_ENTRIES
+        self._cache = OrderedDict()
+        self.cache_metrics = dict.fromkeys(('hits', 'revalidated', 'misses', 'not_found', 'errors', 'stale_served'), 0)
+
+        # Append-only turn log: one item per message in the user's partition, so a turn costs the
+        # same however long the conversation is. Old turns are folded into one summary item.
+        self.log_window = Config.COSMOSDB_LOG_WINDOW
+        self.compact_after = Config.COSMOSDB_COMPACT_AFTER
+        self.compact_keep = Config.COSMOSDB_COMPACT_KEEP
+        # summarize(previous_summary, turns) -> str, e.g. a call to the chat model
+        self.summarize = summarize or digest_summary
+        self._logs = OrderedDict()
+        self._compact_due = set()
+        self._compactor = None
+        self.log_metrics = dict.fromkeys(('appended', 'loads', 'compactions', 'compacted_turns'), 0)
+        if self.write_behind:
+            self._executor = ThreadPoolExecutor(max_workers=Config.COSMOSDB_FLUSH_CONCURRENCY,
+                                                thread_name_prefix='cosmos-flush')
+            self._flusher = threading.Thread(target=self._run, name='cosmos-write-behind', daemon=True)
+            self._flusher.start()
+            # Buffered turns must reach Cosmos even if the caller forgets close(). The flusher
+            # thread keeps the memory alive until close() anyway, so close() unregisters this.
+            atexit.register(self._close_at_exit)
 
     def _initialize_cosmos_client(self):
         from azure.cosmos import CosmosClient
-        return CosmosClient.from_connection_string(self.connection_string)
+        if self.connection_string:
+            return CosmosClient.from_connection_string(self.connection_string)
+        return CosmosClient(Config.COSMOSDB_URI, credential=Config.COSMOSDB_KEY)
 
     def _get_container(self):
         database = self.client.get_database_client(self.database_name)
         return database.get_container_client(self.container_name)
 
+    def _cache_put(self, user_id, memory, etag):
+        with self._cond:
+            self._cache.pop(user_id, None)
+            self._cache[user_id] = {'memory': memory, 'etag': etag, 'validated_at': time.monotonic()}
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def _cache_set_etag(self, user_id, memory, etag):
+        # Record the ETag of a flushed write, unless a newer write replaced the entry meanwhile
+        with self._cond:
+            entry = self._cache.get(user_id)
+            if entry is not None and entry['memory'] is memory:
+                entry['etag'] = etag
+
     def save_memory(self, user_id, memory_data):
+        # The container is partitioned on /partitionKey (see .azure/cosmosdb.bicep)
         item = {
             "id": user_id,
+            "partitionKey": user_id,
             "memory": memory_data
         }
-        self.container.upsert_item(item)
+        if not self.write_behind:
+            stored = self.container.upsert_item(item)
+            self._cache_put(user_id, memory_data, (stored or {}).get('_etag'))
+            return
+
+        # The ETag is unknown until the flush; until then the entry is fresh for cache_ttl
+        self._cache_put(user_id, memory_data, None)
+        with self._cond:
+            self._buffer(item)
 
-    def retrieve_memory(self, user_id):
+    def _buffer(self, item):
+        # Called with self._cond held; pending items are keyed by item id
+        if self._closed:
+            raise RuntimeError("CosmosDBMemory is closed")
+        self.writes += 1
+        if item['id'] in self._pending:
+            # Only the latest memory per user is written
+            self.coalesced += 1
+        self._pending[item['id']] = item
+        if self._oldest_pending is None or len(self._pending) >= self.flush_max_items:
+            # Wake the flusher to start the interval timer, or to flush a full buffer now
+            self._oldest_pending = self._oldest_pending or time.monotonic()
+            self._cond.notify()
+
+    def retrieve_memory(self, user_id, raise_errors=False):
+        served, entry = self._cached_memory(user_id)
+        if served:
+            return entry
         try:
-            item = self.container.read_item(item=user_id, partition_key=user_id)
-            return item.get("memory", None)
+            item = self.container.read_item(item=user_id, partition_key=user_id, **self._conditional(entry))
         except Exception as e:
-            print(f"Error retrieving memory for user {user_id}: {str(e)}")
-            return None
\ No newline at end of file
+            return self._read_failed(user_id, entry, e, raise_errors)
+        return self._read_done(user_id, entry, item)
+
+    def _cached_memory(self, user_id):
+        # (True, memory) when served locally, otherwise (False, cache entry to revalidate or None)
+        with self._cond:
+            item = self._pending.get(user_id) or self._inflight.get(user_id)
+            entry = self._cache.get(user_id)
+            if item is not None:
+                # Read-your-writes: a buffered or in-flight update is newer than what Cosmos has
+                self.cache_metrics['hits'] += 1
+                return True, item.get("memory", None)
+            if entry is not None and time.monotonic() - entry['validated_at'] < self.cache_ttl:
+                self._cache.move_to_end(user_id)
+                self.cache_metrics['hits'] += 1
+                return True, entry['memory']
+        return False, entry
+
+    @staticmethod
+    def _conditional(entry):
+        return {'if_none_match': entry['etag']} if entry is not None and entry['etag'] else {}
+
+    def _read_done(self, user_id, entry, item):
+        if not item and self._conditional(entry):
+            # A 304 comes back as an empty result: the cached memory is still current
+            self._cache_put(user_id, entry['memory'], entry['etag'])
+            self._count('revalidated')
+            return entry['memory']
+        self._count('misses')
+        memory = item.get("memory", None)
+        self._cache_put(user_id, memory, item.get('_etag'))
+        return memory
+
+    def _read_failed(self, user_id, entry, error, raise_errors):
+        if getattr(error, 'status_code', None) == 404:
+            with self._cond:
+                self._cache.pop(user_id, None)
+            self._count('not_found')
+            return None
+        self._count('errors')
+        if raise_errors:
+            raise error
+        print(f"Error retrieving memory for user {user_id}: {str(error)}")
+        if entry is not None:
+            # Better a slightly stale conversation than none while Cosmos is unavailable
+            self._count('stale_served')
+            return entry['memory']
+        return None
+
+    def _count(self, metric):
+        with self._cond:
+            self.cache_metrics[metric] += 1
+
+    def invalidate(self, user_id=None):
+        # Drop one user (or everyone) after an out-of-band change to the container
+        with self._cond:
+            if user_id is None:
+                self._cache.clear()
+                self._logs.clear()
+            else:
+                self._cache.pop(user_id, None)
+                self._logs.pop(user_id, None)
+
+    def _pending_turns(self, user_id):
+        # Called with self._cond held: buffered or in-flight turns that may not be in Cosmos yet
+        return [item for items in (self._inflight, self._pending) for item in items.values()
+                if item.get('type') == 'turn' and item['partitionKey'] == user_id]
+
+    @staticmethod
+    def _parameters(parameters):
+        return [{'name': f'@{name}', 'value': value} for name, value in parameters.items()]
+
+    def _query(self, query, user_id, **parameters):
+        return list(self.container.query_items(query=query, parameters=self._parameters(parameters),
+                                               partition_key=user_id))
+
+    def _read_summary(self, user_id):
+        try:
+            return self.container.read_item(item=f"{user_id}:summary", partition_key=user_id)
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                raise
+            return None
+
+    def _load_log(self, user_id, last_n):
+        summary = self._read_summary(user_id)
+        turns = self._query(LAST_TURNS_QUERY, user_id, n=last_n, type='turn', after=self._through_seq(summary))
+        if summary is None and not turns:
+            turns = self._migrate_legacy(user_id, self.retrieve_memory(user_id, raise_errors=True))[-last_n:]
+        return self._install_log(user_id, summary, turns, last_n)
+
+    @staticmethod
+    def _turn_item(user_id, seq, role, content):
+        return {
+            "id": f"{user_id}:{seq:010d}",
+            "partitionKey": user_id,
+            "type": "turn",
+            "seq": seq,
+            "role": role,
+            "content": content,
+        }
+
+    def _legacy_turns(self, user_id, memory):
+        # Conversations used to be stored as the message list in the user's memory document
+        if not isinstance(memory, list) or not all(
+                isinstance(message, dict) and 'role' in message and 'content' in message for message in memory):
+            return []
+        return [self._turn_item(user_id, seq, message['role'], message['content'])
+                for seq, message in enumerate(memory)]
+
+    def _migrate_legacy(self, user_id, memory):
+        # Copies a legacy conversation into the empty turn log; the memory document is left as is
+        items = self._legacy_turns(user_id, memory)
+        for item in items:
+            try:
+                self.container.create_item(item)
+            except Exception as e:
+                # Another process migrated the same conversation first
+                if not self._conflict(e):
+                    raise
+        return items
+
+    @staticmethod
+    def _conflict(error):
+        return getattr(error, 'status_code', None) == 409
+
+    def _stored_next_seq(self, user_id):
+        # First sequence number after everything in Cosmos, including compacted turns
+        summary = self._read_summary(user_id)
+        newest = self._query(LAST_TURNS_QUERY, user_id, n=1, type='turn', after=self._through_seq(summary))
+        return (newest[0]['seq'] if newest else self._through_seq(summary)) + 1
+
+    def _renumber(self, user_id, items, next_seq):
+        # Called with self._cond held. Moves turns whose sequence numbers another writer took,
+        # and this user's turns buffered behind them, to next_seq onwards, keeping their order.
+        buffered = [key for key, item in self._pending.items()
+                    if item.get('type') == 'turn' and item['partitionKey'] == user_id]
+        turns = sorted(items + [self._pending.pop(key) for key in buffered], key=lambda item: item['seq'])
+        for seq, item in enumerate(turns, next_seq):
+            item.update(id=f"{user_id}:{seq:010d}", seq=seq)
+        self.conflicts += len(items)
+        state = self._logs.get(user_id)
+        if state is not None:
+            # New turns continue after the renumbered ones. The cached window lacks the other
+            # writer's turns, so the next read reloads it.
+            state['next_seq'] = max(state['next_seq'], next_seq + len(turns))
+            state['validated_at'] = float('-inf')
+        return turns
+
+    @staticmethod
+    def _through_seq(summary):
+        return summary['through_seq'] if summary else -1
+
+    def _install_log(self, user_id, summary, turns, last_n):
+        # Builds the cached log state from a summary item and the newest turns read from Cosmos
+        through_seq = self._through_seq(summary)
+        with self._cond:
+            self.log_metrics['loads'] += 1
+            # Merge turns buffered by this process that Cosmos has not seen yet
+            by_seq = {turn['seq']: turn for turn in turns}
+            by_seq.update((turn['seq'], turn) for turn in self._pending_turns(user_id))
+            seqs = sorted(by_seq)
+            state = {
+                'summary': summary['summary'] if summary else None,
+                'through_seq': through_seq,
+                'next_seq': seqs[-1] + 1 if seqs else through_seq + 1,
+                'turns': deque((by_seq[seq] for seq in seqs), maxlen=max(last_n, self.log_window)),
+                # Every live turn is in memory, so no window needs another query
+                'complete': len(turns) < last_n,
+                'validated_at': time.monotonic(),
+            }
+            current = self._logs.get(user_id)
+            if current is not None and current['next_seq'] > state['next_seq']:
+                # Turns were appended while loading; keep the newer state
+                return current
+            self._logs.pop(user_id, None)
+            self._logs[user_id] = state
+            while len(self._logs) > self.cache_max_entries:
+                self._logs.popitem(last=False)
+            return state
+
+    def _fresh_log(self, user_id, last_n):
+        with self._cond:
+            state = self._logs.get(user_id)
+            if (state is not None and time.monotonic() - state['validated_at'] < self.cache_ttl
+                    and (len(state['turns']) >= last_n or state['complete'])):
+                self._logs.move_to_end(user_id)
+                return state
+        return None
+
+    def _log_state(self, user_id, last_n):
+        return self._fresh_log(user_id, last_n) or self._load_log(user_id, last_n)
+
+    def append_turns(self, user_id, turns):
+        """Append chat messages (``{"role", "content"}``) to the user's turn log.
+
+        Each message is written as its own item; nothing already stored is rewritten.
+        """
+        state = self._log_state(user_id, self.log_window)
+        items, due = self._assign_turns(user_id, state, turns)
+        if not self.write_behind:
+            try:
+                self._create_turns(user_id, items)
+            except Exception:
+                self._turns_failed(user_id)
+                raise
+            self._turns_written(user_id, state, items)
+            if due:
+                self._start_compactor()
+
+    def _create_turns(self, user_id, items):
+        # create_item, not upsert: the cached next_seq can be stale (another replica, or a window
+        # loaded before its writes), and an upsert would silently replace that writer's turn.
+        # Turns are written in order, so a conflict never leaves a later turn before an earlier one.
+        for attempt in range(self.TURN_CONFLICT_RETRIES + 1):
+            for i, item in enumerate(items):
+                try:
+                    self.container.create_item(item)
+                except Exception as e:
+                    if not self._conflict(e) or attempt == self.TURN_CONFLICT_RETRIES:
+                        raise
+                    next_seq = self._stored_next_seq(user_id)
+                    with self._cond:
+                        items = self._renumber(user_id, items[i:], next_seq)
+                    break
+            else:
+                return
+
+    def _assign_turns(self, user_id, state, turns):
+        # Numbers the new turns; returns (items, compaction due). Buffered turns join the cached
+        # window right away (reads merge the buffer anyway); synchronous ones once they are created.
+        items = []
+        with self._cond:
+            state = self._logs.get(user_id, state)
+            for turn in turns:
+                seq = state['next_seq']
+                state['next_seq'] += 1
+                item = self._turn_item(user_id, seq, turn['role'], turn['content'])
+                items.append(item)
+                if self.write_behind:
+                    state['turns'].append(item)
+                    self._buffer(item)
+            self.log_metrics['appended'] += len(items)
+            due = state['next_seq'] - state['through_seq'] - 1 >= self.compact_after
+            if due:
+                # Compacted off the request path by the compactor thread: after the flush that
+                # writes these turns, or right away in synchronous mode
+                self._compact_due.add(user_id)
+        return items, due
+
+    def _turns_written(self, user_id, state, items):
+        # Adds created turns to the cached window in sequence order; a concurrent append may
+        # have added later turns first, and a reload may already contain these
+        with self._cond:
+            state = self._logs.get(user_id, state)
+            by_seq = {turn['seq']: turn for turn in state['turns']}
+            by_seq.update((item['seq'], item) for item in items if item['seq'] > state['through_seq'])
+            state['turns'] = deque((by_seq[seq] for seq in sorted(by_seq)), maxlen=state['turns'].maxlen)
+
+    def _turns_failed(self, user_id):
+        # Some turns may have been created before the failure, and the reserved sequence numbers
+        # were not all used, so the next read or append reloads the log from Cosmos
+        with self._cond:
+            self._logs.pop(user_id, None)
+            self._compact_due.discard(user_id)
+
+    def retrieve_turns(self, user_id, last_n=None, include_summary=True, raise_errors=False):
+        """Return the last ``last_n`` messages, oldest first.
+
+        With ``include_summary`` the summary of compacted turns, if any, is prepended as a
+        system message.
+        """
+        last_n = last_n or self.log_window
+        try:
+            state = self._log_state(user_id, last_n)
+        except Exception as e:
+            state = self._log_failed(user_id, e, raise_errors)
+        return self._window(state, last_n, include_summary)
+
+    def _log_failed(self, user_id, error, raise_errors):
+        self._count('errors')
+        if raise_errors:
+            raise error
+        print(f"Error retrieving turns for user {user_id}: {str(error)}")
+        with self._cond:
+            state = self._logs.get(user_id)
+        if state is not None:
+            self._count('stale_served')
+        return state
+
+    def _window(self, state, last_n, include_summary):
+        if state is None:
+            return []
+        with self._cond:
+            turns = list(state['turns'])[-last_n:]
+            summary = state['summary']
+        messages = [{"role": turn['role'], "content": turn['content']} for turn in turns]
+        if include_summary and summary:
+            messages.insert(0, summary_message(summary))
+        return messages
+
+    def compact(self, user_id, keep_last=None):
+        """Fold all but the last ``keep_last`` turns into the summary item and delete them.
+
+        Returns the number of turns compacted. Turns still buffered are never compacted.
+        """
+        state = self._log_state(user_id, self.log_window)
+        state, through_seq, cutoff = self._compaction_range(user_id, state, keep_last)
+        if cutoff <= through_seq + 1:
+            return 0
+
+        turns = self._query(TURN_RANGE_QUERY, user_id, type='turn', after=through_seq, before=cutoff)
+        # The summary is written first: reads skip turns at or below through_seq, so turns left
+        # behind by a failed delete are ignored and removed by the next compaction
+        summary = self.summarize(state['summary'], turns)
+        self.container.upsert_item(self._summary_item(user_id, cutoff, summary))
+
+        def delete(turn):
+            try:
+                self.container.delete_item(item=turn['id'], partition_key=user_id)
+            except Exception as e:
+                self._delete_failed(turn, e)
+
+        self._map(delete, turns)
+        return self._compacted(state, summary, cutoff, turns)
+
+    def _compaction_range(self, user_id, state, keep_last):
+        keep_last = self.compact_keep if keep_last is None else keep_last
+        with self._cond:
+            state = self._logs.get(user_id, state)
+            cutoff = state['next_seq'] - keep_last
+            pending = [turn['seq'] for turn in self._pending_turns(user_id)]
+            if pending:
+                cutoff = min(cutoff, min(pending))
+            return state, state['through_seq'], cutoff
+
+    @staticmethod
+    def _summary_item(user_id, cutoff, summary):
+        return {
+            "id": f"{user_id}:summary",
+            "partitionKey": user_id,
+            "type": "summary",
+            "through_seq": cutoff - 1,
+            "summary": summary,
+        }
+
+    @staticmethod
+    def _delete_failed(turn, error):
+        if getattr(error, 'status_code', None) != 404:
+            print(f"Error deleting compacted turn {turn['id']}: {str(error)}")
+
+    def _compacted(self, state, summary, cutoff, turns):
+        with self._cond:
+            state['summary'] = summary
+            state['through_seq'] = max(state['through_seq'], cutoff - 1)
+            while state['turns'] and state['turns'][0]['seq'] <= state['through_seq']:
+                state['turns'].popleft()
+            self.log_metrics['compactions'] += 1
+            self.log_metrics['compacted_turns'] += len(turns)
+        return len(turns)
+
+    def _start_compactor(self):
+        with self._cond:
+            if self._compactor is not None and self._compactor.is_alive():
+                # The running compactor picks up users added meanwhile
+                return
+            self._compactor = threading.Thread(target=self._compact_pending, name='cosmos-compact', daemon=True)
+            self._compactor.start()
+
+    def _next_compaction(self):
+        with self._cond:
+            return self._compact_due.pop() if self._compact_due else None
+
+    def _compact_pending(self):
+        while True:
+            user_id = self._next_compaction()
+            if user_id is None:
+                return
+            try:
+                self.compact(user_id)
+            except Exception as e:
+                print(f"Error compacting memory for user {user_id}: {str(e)}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if len(self._pending) >= self.flush_max_items:
+                        break
+                    if self._oldest_pending is not None:
+                        remaining = self._oldest_pending + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+            try:
+                self._flush_pending()
+                # Summarizing may call the model, so it must not hold up the next flush
+                if self._compact_due:
+                    self._start_compactor()
+            except Exception as e:
+                # Failed items stay buffered and are retried on the next flush
+                print(f"Error flushing memory to Cosmos DB: {str(e)}")
+                time.sleep(min(self.flush_interval, 1.0))
+
+    def _flush_pending(self):
+        with self._flush_lock:
+            flushed, renumbered = self._flush_batch()
+            # Turns renumbered after a conflict are written now rather than a flush interval later
+            for _ in range(self.TURN_CONFLICT_RETRIES):
+                if not renumbered:
+                    break
+                written, renumbered = self._flush_batch()
+                flushed += written
+            return flushed
+
+    def _write_items(self, items):
+        # Writes a memory document, or one user's turns in sequence order so that a conflict never
+        # leaves a later turn stored before an earlier one. Returns {id: error} for unwritten items.
+        for i, item in enumerate(items):
+            try:
+                if item.get('type') == 'turn':
+                    self.container.create_item(item)
+                    continue
+                stored = self.container.upsert_item(item)
+            except Exception as e:
+                return {rest['id']: e for rest in items[i:]}
+            if 'memory' in item:
+                self._cache_set_etag(item['id'], item['memory'], (stored or {}).get('_etag'))
+        return {}
+
+    def _map(self, function, items):
+        # atexit handlers run after concurrent.futures has shut its executors down, so the final
+        # flush at exit calls the function on this thread, as does synchronous mode
+        if not self.write_behind or self._serial:
+            return [function(item) for item in items]
+        futures = []
+        for i, item in enumerate(items):
+            try:
+                futures.append(self._executor.submit(function, item))
+            except RuntimeError:
+                # Interpreter shutdown started while submitting; write the rest on this thread
+                return [future.result() for future in futures] + [function(rest) for rest in items[i:]]
+        return [future.result() for future in futures]
+
+    def _flush_batch(self):
+        # Returns (items written, whether conflicting turns were renumbered and requeued)
+        with self._cond:
+            batch, self._pending = self._pending, {}
+            # Still visible to readers of buffered turns until the writes complete
+            self._inflight = batch
+            self._oldest_pending = None
+        if not batch:
+            return 0, False
+
+        groups, logs = [], {}
+        for item in batch.values():
+            if item.get('type') == 'turn':
+                logs.setdefault(item['partitionKey'], []).append(item)
+            else:
+                groups.append([item])
+        groups += [sorted(turns, key=lambda item: item['seq']) for turns in logs.values()]
+        failed = {}
+        for errors in self._map(self._write_items, groups):
+            failed.update(errors)
+
+        conflicts = {}
+        for key, error in failed.items():
+            if batch[key].get('type') == 'turn' and self._conflict(error):
+                conflicts.setdefault(batch[key]['partitionKey'], []).append(batch[key])
+        next_seqs = {}
+        for user_id in conflicts:
+            try:
+                next_seqs[user_id] = self._stored_next_seq(user_id)
+            except Exception:
+                # Requeued unchanged; the next flush conflicts again and retries the lookup
+                pass
+        resolved = {item['id'] for user_id in next_seqs for item in conflicts[user_id]}
+
+        with self._cond:
+            self._inflight = {}
+            self.upserts += len(batch) - len(failed)
+            for user_id, next_seq in next_seqs.items():
+                for item in self._renumber(user_id, conflicts[user_id], next_seq):
+                    self._pending[item['id']] = item
+            for key in failed:
+                if key in resolved:
+                    continue
+                self.failures += 1
+                # Requeue unless a newer write arrived while this one was in flight
+                if key not in self._pending:
+                    self._pending[key] = batch[key]
+            if self._pending:
+                self._oldest_pending = self._oldest_pending or time.monotonic()
+        errors = [error for key, error in failed.items() if key not in resolved]
+        if errors:
+            raise errors[0]
+        return len(batch) - len(failed), bool(next_seqs)
+
+    def flush(self):
+        # Durable flush: returns once every buffered update is in Cosmos, or raises
+        if not self.write_behind:
+            return 0
+        return self._flush_pending()
+
+    def _close_at_exit(self):
+        self._serial = True
+        self.close()
+
+    def close(self):
+        if not self.write_behind or self._closed:
+            return
+        if not self._serial:
+            atexit.unregister(self._close_at_exit)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        try:
+            self.flush()
+            # Compaction deletes go through the executor, so let a running pass finish first
+            compactor = self._compactor
+            if compactor is not None:
+                compactor.join()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'writes': self.writes,
+                'coalesced': self.coalesced,
+                'upserts': self.upserts,
+                'failures': self.failures,
+                'conflicts': self.conflicts,
+                'pending': len(self._pending),
+                'cache': dict(self.cache_metrics, entries=len(self._cache)),
+                'log': dict(self.log_metrics, users=len(self._logs), compactions_due=len(self._compact_due)),
+            }
+
+
+_shared_async_client = None
+
+
+def get_async_cosmos_client(connection_string=None):
+    """Return the process-wide azure.cosmos.aio client, creating it on first use.
+
+    One client keeps one connection pool and one copy of the account and partition metadata
+    for every async memory in the process.
+    """
+    global _shared_async_client
+    if _shared_async_client is None:
+        from azure.cosmos.aio import CosmosClient
+        if connection_string:
+            _shared_async_client = CosmosClient.from_connection_string(connection_string)
+        else:
+            _shared_async_client = CosmosClient(Config.COSMOSDB_URI, credential=Config.COSMOSDB_KEY)
+    return _shared_async_client
+
+
+async def close_async_cosmos_client():
+    global _shared_async_client
+    if _shared_async_client is not None:
+        await _shared_async_client.close()
+        _shared_async_client = None
+
+
+class AsyncCosmosDBMemory(CosmosDBMemory):
+    """Same API as ``CosmosDBMemory`` with awaitable methods, backed by the shared azure.cosmos.aio client.
+
+    Writes are awaited directly instead of going through the write-behind thread: they no
+    longer block the event loop, and concurrent requests overlap their round trips.
+    """
+
+    def __init__(self, connection_string=None, container=None, summarize=None):
+        super().__init__(connection_string, write_behind=False, container=container, summarize=summarize)
+
+    def _initialize_cosmos_client(self):
+        return get_async_cosmos_client(self.connection_string)
+
+    async def save_memory(self, user_id, memory_data):
+        item = {
+            "id": user_id,
+            "partitionKey": user_id,
+            "memory": memory_data
+        }
+        stored = await self.container.upsert_item(item)
+        self._cache_put(user_id, memory_data, (stored or {}).get('_etag'))
+
+    async def retrieve_memory(self, user_id, raise_errors=False):
+        served, entry = self._cached_memory(user_id)
+        if served:
+            return entry
+        try:
+            item = await self.container.read_item(item=user_id, partition_key=user_id, **self._conditional(entry))
+        except Exception as e:
+            return self._read_failed(user_id, entry, e, raise_errors)
+        return self._read_done(user_id, entry, item)
+
+    async def _query(self, query, user_id, **parameters):
+        return [item async for item in self.container.query_items(
+            query=query, parameters=self._parameters(parameters), partition_key=user_id)]
+
+    async def _read_summary(self, user_id):
+        try:
+            return await self.container.read_item(item=f"{user_id}:summary", partition_key=user_id)
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                raise
+            return None
+
+    async def _load_log(self, user_id, last_n):
+        summary = await self._read_summary(user_id)
+        turns = await self._query(LAST_TURNS_QUERY, user_id, n=last_n, type='turn', after=self._through_seq(summary))
+        if summary is None and not turns:
+            memory = await self.retrieve_memory(user_id, raise_errors=True)
+            turns = (await self._migrate_legacy(user_id, memory))[-last_n:]
+        return self._install_log(user_id, summary, turns, last_n)
+
+    async def _migrate_legacy(self, user_id, memory):
+        items = self._legacy_turns(user_id, memory)
+        for item in items:
+            try:
+                await self.container.create_item(item)
+            except Exception as e:
+                if not self._conflict(e):
+                    raise
+        return items
+
+    async def _stored_next_seq(self, user_id):
+        summary = await self._read_summary(user_id)
+        newest = await self._query(LAST_TURNS_QUERY, user_id, n=1, type='turn', after=self._through_seq(summary))
+        return (newest[0]['seq'] if newest else self._through_seq(summary)) + 1
+
+    async def _log_state(self, user_id, last_n):
+        return self._fresh_log(user_id, last_n) or await self._load_log(user_id, last_n)
+
+    async def append_turns(self, user_id, turns):
+        state = await self._log_state(user_id, self.log_window)
+        items, due = self._assign_turns(user_id, state, turns)
+        try:
+            await self._create_turns(user_id, items)
+        except Exception:
+            self._turns_failed(user_id)
+            raise
+        self._turns_written(user_id, state, items)
+        if due:
+            self._start_compactor()
+
+    async def _create_turns(self, user_id, items):
+        for attempt in range(self.TURN_CONFLICT_RETRIES + 1):
+            for i, item in enumerate(items):
+                try:
+                    await self.container.create_item(item)
+                except Exception as e:
+                    if not self._conflict(e) or attempt == self.TURN_CONFLICT_RETRIES:
+                        raise
+                    next_seq = await self._stored_next_seq(user_id)
+                    with self._cond:
+                        items = self._renumber(user_id, items[i:], next_seq)
+                    break
+            else:
+                return
+
+    async def retrieve_turns(self, user_id, last_n=None, include_summary=True, raise_errors=False):
+        last_n = last_n or self.log_window
+        try:
+            state = await self._log_state(user_id, last_n)
+        except Exception as e:
+            state = self._log_failed(user_id, e, raise_errors)
+        return self._window(state, last_n, include_summary)
+
+    async def compact(self, user_id, keep_last=None):
+        state = await self._log_state(user_id, self.log_window)
+        state, through_seq, cutoff = self._compaction_range(user_id, state, keep_last)
+        if cutoff <= through_seq + 1:
+            return 0
+
+        turns = await self._query(TURN_RANGE_QUERY, user_id, type='turn', after=through_seq, before=cutoff)
+        summary = self.summarize(state['summary'], turns)
+        if asyncio.iscoroutine(summary):
+            # A model-backed summarizer may be async
+            summary = await summary
+        await self.container.upsert_item(self._summary_item(user_id, cutoff, summary))
+
+        async def delete(turn):
+            try:
+                await self.container.delete_item(item=turn['id'], partition_key=user_id)
+            except Exception as e:
+                self._delete_failed(turn, e)
+
+        await asyncio.gather(*[delete(turn) for turn in turns])
+        return self._compacted(state, summary, cutoff, turns)
+
+    def _start_compactor(self):
+        if self._compactor is None or self._compactor.done():
+            # The running task picks up users added meanwhile
+            self._compactor = asyncio.get_running_loop().create_task(self._compact_pending())
+
+    async def _compact_pending(self):
+        while True:
+            user_id = self._next_compaction()
+            if user_id is None:
+                return
+            try:
+                await self.compact(user_id)
+            except Exception as e:
+                print(f"Error compacting memory for user {user_id}: {str(e)}")
+
+    async def warm_up(self, user_ids, max_concurrency=None):
+        """Preload memory and recent turns for many users, e.g. for sessions about to resume.
+
+        Memory and summary items for all users come back from one batched ``read_items``
+        call; the turn windows are then read with up to ``max_concurrency`` concurrent queries.
+        Returns the number of users whose log was loaded.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return 0
+        keys = [(user_id, user_id) for user_id in user_ids]
+        keys += [(f"{user_id}:summary", user_id) for user_id in user_ids]
+        # Items that do not exist are left out of the result
+        found = {item['id']: item for item in await self.container.read_items(items=keys)}
+        for user_id in user_ids:
+            if user_id in found:
+                self._cache_put(user_id, found[user_id].get("memory", None), found[user_id].get('_etag'))
+
+        semaphore = asyncio.Semaphore(max_concurrency or Config.COSMOSDB_WARM_UP_CONCURRENCY)
+
+        async def load(user_id):
+            summary = found.get(f"{user_id}:summary")
+            async with semaphore:
+                turns = await self._query(LAST_TURNS_QUERY, user_id, n=self.log_window, type='turn',
+                                          after=self._through_seq(summary))
+                if summary is None and not turns and user_id in found:
+                    legacy = await self._migrate_legacy(user_id, found[user_id].get("memory", None))
+                    turns = legacy[-self.log_window:]
+            self._install_log(user_id, summary, turns, self.log_window)
+
+        results = await asyncio.gather(*[load(user_id) for user_id in user_ids], return_exceptions=True)
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, Exception):
+                print(f"Error warming up memory for user {user_id}: {str(result)}")
+        return sum(not isinstance(result, Exception) for result in results)
@@ -0,0 +1,221 @@
+import json
+import sqlite3
+import threading
+
+from config.settings import Config
+from memory.backend import MemoryBackend, digest_summary, summary_message
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS turns (
+    user_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (user_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS summaries (
+    user_id TEXT PRIMARY KEY,
+    through_seq INTEGER NOT NULL,
+    summary TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Statements are constant strings, so sqlite3's per-connection statement cache prepares each once
+UPSERT_MEMORY = ("INSERT INTO memory (user_id, data) VALUES (?, ?) "
+                 "ON CONFLICT (user_id) DO UPDATE SET data = excluded.data")
+SELECT_MEMORY = "SELECT data FROM memory WHERE user_id = ?"
+SELECT_SUMMARY = "SELECT through_seq, summary FROM summaries WHERE user_id = ?"
+NEXT_SEQ = "SELECT MAX(seq) FROM turns WHERE user_id = ?"
+INSERT_TURN = "INSERT INTO turns (user_id, seq, role, content) VALUES (?, ?, ?, ?)"
+REPLACE_TURN = "INSERT OR REPLACE INTO turns (user_id, seq, role, content) VALUES (?, ?, ?, ?)"
+LAST_TURNS = ("SELECT seq, role, content FROM turns WHERE user_id = ? AND seq > ? "
+              "ORDER BY seq DESC LIMIT ?")
+TURN_RANGE = "SELECT seq, role, content FROM turns WHERE user_id = ? AND seq > ? AND seq < ? ORDER BY seq"
+UPSERT_SUMMARY = ("INSERT INTO summaries (user_id, through_seq, summary) VALUES (?, ?, ?) "
+                  "ON CONFLICT (user_id) DO UPDATE SET through_seq = excluded.through_seq, "
+                  "summary = excluded.summary")
+DELETE_TURNS = "DELETE FROM turns WHERE user_id = ? AND seq <= ?"
+# PRAGMA values cannot be bound as parameters, so the setting is checked against this list instead
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+class SQLiteMemory(MemoryBackend):
+    """Local memory store for development, tests and single-node deployments.
+
+    Same API as ``CosmosDBMemory`` without the network round trips. The database runs in WAL
+    mode: readers never wait for the writer, and each commit appends to the log instead of
+    rewriting pages. Each thread gets its own connection; appends take the write lock up front
+    (``BEGIN IMMEDIATE``) so concurrent writers cannot hand out the same sequence number.
+    ``bulk_load`` and ``export_items`` use the Cosmos item shapes, so data can move between
+    the two stores.
+    """
+
+    def __init__(self, path=None, summarize=None, synchronous=None):
+        self.path = path or Config.MEMORY_SQLITE_PATH
+        self.synchronous = (synchronous or Config.MEMORY_SQLITE_SYNCHRONOUS).upper()
+        if self.synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {self.synchronous} (expected one of {', '.join(SYNCHRONOUS_MODES)})")
+        self.log_window = Config.COSMOSDB_LOG_WINDOW
+        self.compact_after = Config.COSMOSDB_COMPACT_AFTER
+        self.compact_keep = Config.COSMOSDB_COMPACT_KEEP
+        # summarize(previous_summary, turns) -> str, e.g. a call to the chat model
+        self.summarize = summarize or digest_summary
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.log_metrics = dict.fromkeys(('appended', 'compactions', 'compacted_turns'), 0)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # isolation_level=None: transactions are explicit, so reads never hold a write lock
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                                         timeout=30, cached_statements=64)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def save_memory(self, user_id, memory_data):
+        self._connection().execute(UPSERT_MEMORY, (user_id, json.dumps(memory_data)))
+
+    def retrieve_memory(self, user_id, raise_errors=False):
+        row = self._connection().execute(SELECT_MEMORY, (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _through_seq(self, connection, user_id):
+        row = connection.execute(SELECT_SUMMARY, (user_id,)).fetchone()
+        return (row[0], row[1]) if row else (-1, None)
+
+    def append_turns(self, user_id, turns):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            last = connection.execute(NEXT_SEQ, (user_id,)).fetchone()[0]
+            through_seq, _ = self._through_seq(connection, user_id)
+            first = max(-1 if last is None else last, through_seq) + 1
+            rows = [(user_id, first + i, turn['role'], turn['content']) for i, turn in enumerate(turns)]
+            connection.executemany(INSERT_TURN, rows)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.log_metrics['appended'] += len(rows)
+        # Local and cheap enough to run inline, unlike the Cosmos store
+        if first + len(rows) - through_seq - 1 >= self.compact_after:
+            self.compact(user_id)
+
+    def retrieve_turns(self, user_id, last_n=None, include_summary=True, raise_errors=False):
+        last_n = last_n or self.log_window
+        connection = self._connection()
+        # One read transaction, so the summary and the window come from the same snapshot
+        connection.execute("BEGIN")
+        try:
+            through_seq, summary = self._through_seq(connection, user_id)
+            rows = connection.execute(LAST_TURNS, (user_id, through_seq, last_n)).fetchall()
+        finally:
+            connection.execute("COMMIT")
+        messages = [{"role": role, "content": content} for _, role, content in reversed(rows)]
+        if include_summary and summary:
+            messages.insert(0, summary_message(summary))
+        return messages
+
+    def compact(self, user_id, keep_last=None):
+        keep_last = self.compact_keep if keep_last is None else keep_last
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            last = connection.execute(NEXT_SEQ, (user_id,)).fetchone()[0]
+            through_seq, previous = self._through_seq(connection, user_id)
+            cutoff = max(-1 if last is None else last, through_seq) + 1 - keep_last
+            turns = [{"seq": seq, "role": role, "content": content} for seq, role, content
+                     in connection.execute(TURN_RANGE, (user_id, through_seq, cutoff))]
+        finally:
+            connection.execute("COMMIT")
+        if cutoff <= through_seq + 1:
+            return 0
+
+        # Summarizing may call the model, so it runs outside the write lock
+        summary = self.summarize(previous, turns)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if self._through_seq(connection, user_id)[0] != through_seq:
+                # Another writer compacted meanwhile
+                connection.execute("COMMIT")
+                return 0
+            # Summary and deletes commit together, so no turn is ever both summarized and live
+            connection.execute(UPSERT_SUMMARY, (user_id, cutoff - 1, summary))
+            connection.execute(DELETE_TURNS, (user_id, cutoff - 1))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.log_metrics['compactions'] += 1
+            self.log_metrics['compacted_turns'] += len(turns)
+        return len(turns)
+
+    def bulk_load(self, items):
+        """Insert Cosmos-shaped items (memory documents, turns and summaries) in one transaction.
+
+        Existing rows with the same keys are replaced. Returns the number of items loaded.
+        """
+        memory, turns, summaries = [], [], []
+        for item in items:
+            user_id = item.get('partitionKey', item['id'])
+            if item.get('type') == 'turn':
+                turns.append((user_id, item['seq'], item['role'], item['content']))
+            elif item.get('type') == 'summary':
+                summaries.append((user_id, item['through_seq'], item['summary']))
+            elif 'memory' in item:
+                memory.append((user_id, json.dumps(item['memory'])))
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(UPSERT_MEMORY, memory)
+            connection.executemany(REPLACE_TURN, turns)
+            connection.executemany(UPSERT_SUMMARY, summaries)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return len(memory) + len(turns) + len(summaries)
+
+    def export_items(self):
+        """Yield every stored record as a Cosmos-shaped item, e.g. to seed a container."""
+        connection = self._connection()
+        for user_id, data in connection.execute("SELECT user_id, data FROM memory ORDER BY user_id"):
+            yield {"id": user_id, "partitionKey": user_id, "memory": json.loads(data)}
+        for user_id, through_seq, summary in connection.execute(
+                "SELECT user_id, through_seq, summary FROM summaries ORDER BY user_id"):
+            yield {"id": f"{user_id}:summary", "partitionKey": user_id, "type": "summary",
+                   "through_seq": through_seq, "summary": summary}
+        for user_id, seq, role, content in connection.execute(
+                "SELECT user_id, seq, role, content FROM turns ORDER BY user_id, seq"):
+            yield {"id": f"{user_id}:{seq:010d}", "partitionKey": user_id, "type": "turn",
+                   "seq": seq, "role": role, "content": content}
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def stats(self):
+        connection = self._connection()
+        with self._lock:
+            log = dict(self.log_metrics)
+        return {
+            'users': connection.execute("SELECT COUNT(*) FROM memory").fetchone()[0],
+            'turns': connection.execute("SELECT COUNT(*) FROM turns").fetchone()[0],
+            'log': log,
+        }
@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from config.settings import Config
+
+try:
+    import tiktoken
+except ImportError:  # Optional: token counts fall back to a characters-per-token estimate
+    tiktoken = None
+
+
+class EmbeddingCache:
+    """LRU cache of embeddings stored as rows of one float32 matrix.
+
+    A 1024-dimension vector costs 4 KB here instead of ~32 KB as a list of Python floats.
+    Evicted rows are reused, so the matrix never grows beyond ``max_entries`` rows.
+    """
+
+    def __init__(self, max_entries=None, dimensions=None):
+        self.max_entries = max_entries or Config.EMBEDDING_CACHE_SIZE
+        self.dimensions = dimensions
+        self._matrix = None
+        self._rows = OrderedDict()
+        self._free = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return self._matrix[row].copy()
+
+    def put(self, key, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.ndim != 1:
+            raise ValueError(f"Expected a flat embedding vector, got shape {vector.shape}")
+        if self.dimensions and len(vector) != self.dimensions:
+            raise ValueError(f"Expected a {self.dimensions}-dimension embedding, got {len(vector)}")
+        with self._lock:
+            if self._matrix is None:
+                self.dimensions = self.dimensions or len(vector)
+                self._matrix = np.empty((min(self.max_entries, 1024), self.dimensions), dtype=np.float32)
+            row = self._rows.pop(key, None)
+            if row is None:
+                row = self._allocate_row()
+            self._matrix[row] = vector
+            self._rows[key] = row
+        return vector
+
+    def _allocate_row(self):
+        if self._free:
+            return self._free.pop()
+        if len(self._rows) >= self.max_entries:
+            _, row = self._rows.popitem(last=False)
+            return row
+        row = len(self._rows)
+        if row >= len(self._matrix):
+            # Grow geometrically up to max_entries rows
+            grown = np.empty((min(len(self._matrix) * 2, self.max_entries), self.dimensions), dtype=np.float32)
+            grown[:len(self._matrix)] = self._matrix
+            self._matrix = grown
+        return row
+
+    def clear(self):
+        with self._lock:
+            self._free.extend(self._rows.values())
+            self._rows.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._rows),
+            'bytes': 0 if self._matrix is None else self._matrix.nbytes,
+        }
+
+
+class EmbeddingClient:
+    """Embedding client that coalesces concurrent requests into batched API calls.
+
+    ``embed(text)`` can be called from many threads (or awaited via ``embed_async``).
+    Requests arriving within ``window_ms`` of each other are sent as one call. Identical
+    texts are embedded once, cached vectors are never re-requested, and each call stays
+    under ``batch_size`` inputs and ``max_batch_tokens`` tokens. ``embed_many`` embeds a
+    known list directly (for ingestion).
+    """
+
+    def __init__(self, model=None, api_key=None, dimensions=None, batch_size=None, max_batch_tokens=None,
+                 window_ms=None, max_inflight=None, cache=None, create=None):
+        self.model = model or Config.EMBEDDING_MODEL
+        self.api_key = api_key or Config.EMBEDDING_API_KEY
+        self.dimensions = dimensions or Config.EMBEDDING_DIMENSIONS
+        self.batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        self.max_batch_tokens = max_batch_tokens or Config.EMBEDDING_MAX_BATCH_TOKENS
+        self.window = (Config.EMBEDDING_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.cache = cache or EmbeddingCache(dimensions=self.dimensions)
+        # create(list[str]) -> list[list[float]]; defaults to the OpenAI embeddings endpoint
+        self.create = create or self._create
+        self._encoding = tiktoken.get_encoding('cl100k_base') if tiktoken else None
+        self._queue = []
+        # One shared future per text being embedded, so repeats join the pending request
+        self._inflight = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight or Config.EMBEDDING_MAX_INFLIGHT,
+                                            thread_name_prefix='embedding-request')
+        self._cond = threading.Condition()
+        self._worker = None
+        self._closed = False
+        self.requests = 0
+        self.texts = 0
+        self.duplicates = 0
+
+    def _create(self, texts):
+        import openai
+
+        kwargs = {'input': texts, 'api_key': self.api_key, 'dimensions': self.dimensions}
+        if Config.EMBEDDING_API_BASE:
+            kwargs['api_base'] = Config.EMBEDDING_API_BASE
+        if Config.EMBEDDING_API_TYPE == 'azure':
+            kwargs.update(api_type='azure', api_version=Config.EMBEDDING_API_VERSION,
+                          engine=Config.EMBEDDING_DEPLOYMENT or self.model)
+        else:
+            kwargs['model'] = self.model
+        response = openai.Embedding.create(**kwargs)
+        return [item['embedding'] for item in sorted(response['data'], key=lambda item: item['index'])]
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model}:{self.dimensions}:{text}".encode('utf-8')).hexdigest()
+
+    def count_tokens(self, text):
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(text) // 4 + 1
+
+    def _batches(self, texts):
+        batch, tokens = [], 0
+        for text in texts:
+            count = self.count_tokens(text)
+            if batch and (len(batch) >= self.batch_size or tokens + count > self.max_batch_tokens):
+                yield batch
+                batch, tokens = [], 0
+            batch.append(text)
+            tokens += count
+        if batch:
+            yield batch
+
+    def _embed_unique(self, texts, count=True):
+        # Returns {text: vector}; every distinct uncached text is requested exactly once
+        vectors, missing = {}, []
+        unique = list(dict.fromkeys(texts))
+        if count:
+            with self._cond:
+                self.texts += len(texts)
+                self.duplicates += len(texts) - len(unique)
+        for text in unique:
+            vector = self.cache.get(self._key(text))
+            if vector is None:
+                missing.append(text)
+            else:
+                vectors[text] = vector
+        for batch in self._batches(missing):
+            with self._cond:
+                self.requests += 1
+            created = self.create(batch)
+            if len(created) != len(batch):
+                raise ValueError(f"Embedding request returned {len(created)} vectors for {len(batch)} inputs")
+            for text, vector in zip(batch, created):
+                vectors[text] = self.cache.put(self._key(text), vector)
+        return vectors
+
+    def embed_many(self, texts):
+        texts = list(texts)
+        vectors = self._embed_unique(texts)
+        return [vectors[text] for text in texts]
+
+    def submit(self, text):
+        key = self._key(text)
+        vector = self.cache.get(key)
+        with self._cond:
+            self.texts += 1
+            if vector is not None:
+                future = Future()
+                future.set_result(vector)
+                return future
+            if key in self._inflight:
+                self.duplicates += 1
+                return self._inflight[key]
+            if self._closed:
+                raise RuntimeError("EmbeddingClient is closed")
+            future = self._inflight[key] = Future()
+            self._queue.append((text, future))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def embed(self, text):
+        return self.submit(text).result()
+
+    async def embed_async(self, text):
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                # Hold the batch open for the window so concurrent callers share one request
+                deadline = time.monotonic() + self.window
+                while len(self._queue) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._queue = self._queue, []
+            # Up to max_inflight batches are sent in parallel while the next window fills
+            self._executor.submit(self._resolve, batch)
+
+    def _resolve(self, batch):
+        error = None
+        try:
+            vectors = self._embed_unique([text for text, _ in batch], count=False)
+        except Exception as e:
+            vectors, error = {}, e
+        with self._cond:
+            for text, _ in batch:
+                self._inflight.pop(self._key(text), None)
+        for text, future in batch:
+            if text in vectors:
+                future.set_result(vectors[text])
+            else:
+                # Every future must be resolved, or embed() would block forever
+                future.set_exception(error or RuntimeError("No embedding was returned for this text"))
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            'texts': self.texts,
+            'requests': self.requests,
+            'duplicates': self.duplicates,
+            'cache': self.cache.stats(),
+        }
@@ -1,17 +1,204 @@
+import time
+from contextlib import contextmanager
+
+import openai
+
+from config.settings import Config
+from models.response_cache import build_response_cache, make_key
+from transport.http_pool import get_async_http_pool, get_http_pool
+
+# The client uses the openai 0.x interface (ChatCompletion, api_requestor, aiosession), which
+# openai 1.0 removed; requirements.txt pins the version it was written against
+OPENAI_VERSION = '0.27.0'
+
+
+def _check_openai_version():
+    installed = openai.version.VERSION
+    if not (0, 27) <= tuple(int(part) for part in installed.split('.')[:2]) < (1, 0):
+        raise ImportError(f"models.gpt4o needs openai=={OPENAI_VERSION} (pinned in requirements.txt), "
+                          f"but openai {installed} is installed; run pip install openai=={OPENAI_VERSION}")
+
+
+_check_openai_version()
+
+
+class StreamMetrics:
+    """Time-to-first-token and generation rate of one streamed completion."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.tokens = 0
+
+    def token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+
+    def finish(self):
+        end = time.perf_counter()
+        generating = end - self.first_token_at if self.first_token_at else 0.0
+        return {
+            'ttft_ms': round((self.first_token_at - self.start) * 1000, 1) if self.first_token_at else None,
+            'total_ms': round((end - self.start) * 1000, 1),
+            # Each streamed delta carries roughly one token
+            'tokens': self.tokens,
+            'tokens_per_second': round(self.tokens / generating, 1) if generating > 0 else None,
+        }
+
+
 class GPT4OModel:
-    def __init__(self, model_name: str, api_key: str):
+    def __init__(self, model_name: str, api_key: str, http_pool=None, cache=None):
         self.model_name = model_name
         self.api_key = api_key
+        self.parameters = {}
+        # Completions reuse the keep-alive pool shared with the search and GitHub clients
+        self.http = http_pool or get_http_pool()
+        # Repeated deterministic prompts are answered from here (see models/response_cache.py)
+        self.cache = cache if cache is not None else build_response_cache()
+        self.last_metrics = {}
+
+    @contextmanager
+    def _pooled_session(self):
+        # openai==0.27.0 (pinned in requirements.txt) has no per-call session parameter and
+        # sends each request through a requests.Session cached per thread. Swap the pooled
+        # session in for the request only and put the thread's own session back afterwards.
+        from openai import api_requestor
+
+        context = api_requestor._thread_context
+        previous = getattr(context, 'session', None)
+        context.session = self.http.session
+        try:
+            yield
+        finally:
+            if previous is None:
+                del context.session
+            else:
+                context.session = previous
+
+    @staticmethod
+    @contextmanager
+    def _pooled_aiosession():
+        # openai.aiosession is the library's supported hook; reset it so the override
+        # does not leak into unrelated calls in the same context
+        token = openai.aiosession.set(get_async_http_pool().get_session())
+        try:
+            yield
+        finally:
+            openai.aiosession.reset(token)
+
+    @staticmethod
+    def _messages(prompt):
+        return [{"role": "user", "content": prompt}] if isinstance(prompt, str) else prompt
+
+    @staticmethod
+    def _call_parameters(temperature, max_tokens, parameters):
+        # Per-call settings override set_model_parameters(); None keeps the model-level value
+        explicit = {'temperature': temperature, 'max_tokens': max_tokens}
+        return {**parameters, **{name: value for name, value in explicit.items() if value is not None}}
+
+    def _cache_key(self, prompt, parameters, use_cache):
+        parameters = {**self.parameters, **parameters}
+        if not use_cache or self.cache is None or not self.cache.cacheable(parameters):
+            return None
+        return make_key(Config.GPT4O_DEPLOYMENT or self.model_name, parameters, self._messages(prompt))
+
+    def _cached(self, key):
+        text = self.cache.get(key) if key else None
+        if text is not None:
+            self.last_metrics = {'ttft_ms': 0.0, 'total_ms': 0.0, 'tokens': 0, 'tokens_per_second': None,
+                                 'cached': True}
+        return text
+
+    def _request_args(self, prompt, parameters):
+        kwargs = {**self.parameters, **parameters, 'messages': self._messages(prompt), 'stream': True,
+                  'api_key': self.api_key}
+        if Config.GPT4O_API_BASE:
+            kwargs['api_base'] = Config.GPT4O_API_BASE
+        if Config.GPT4O_API_TYPE == 'azure':
+            kwargs.update(api_type='azure', api_version=Config.GPT4O_API_VERSION,
+                          engine=Config.GPT4O_DEPLOYMENT or self.model_name)
+        else:
+            kwargs['model'] = self.model_name
+        return kwargs
+
+    @staticmethod
+    def _delta(chunk):
+        # Azure sends a first chunk with no choices (prompt filter results)
+        choices = chunk.get('choices') or []
+        return choices[0].get('delta', {}).get('content') if choices else None
+
+    def stream_response(self, prompt, use_cache=True, temperature=None, max_tokens=None, **parameters):
+        """Yield the completion text as it is generated.
+
+        ``prompt`` is a string or a list of chat messages. ``temperature``, ``max_tokens``
+        and any other keyword (``top_p``, ``stop``, ...) apply to this call only and are part
+        of the cache key. Metrics for the call are available in ``last_metrics`` once the
+        stream is exhausted or closed. A cached completion is yielded in one piece;
+        ``use_cache=False`` always calls the model.
+        """
+        parameters = self._call_parameters(temperature, max_tokens, parameters)
+        key = self._cache_key(prompt, parameters, use_cache)
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+
+        metrics = StreamMetrics()
+        parts = []
+        try:
+            # The request is sent by create(); the stream then reads from the open response
+            with self._pooled_session():
+                stream = openai.ChatCompletion.create(**self._request_args(prompt, parameters))
+            for chunk in stream:
+                text = self._delta(chunk)
+                if text:
+                    metrics.token()
+                    parts.append(text)
+                    yield text
+        finally:
+            self.last_metrics = metrics.finish()
+        # Only complete streams are stored; a stream closed early never reaches this point
+        if key:
+            self.cache.put(key, "".join(parts))
+
+    async def astream_response(self, prompt, use_cache=True, temperature=None, max_tokens=None, **parameters):
+        parameters = self._call_parameters(temperature, max_tokens, parameters)
+        key = self._cache_key(prompt, parameters, use_cache)
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+
+        metrics = StreamMetrics()
+        parts = []
+        try:
+            with self._pooled_aiosession():
+                stream = await openai.ChatCompletion.acreate(**self._request_args(prompt, parameters))
+            async for chunk in stream:
+                text = self._delta(chunk)
+                if text:
+                    metrics.token()
+                    parts.append(text)
+                    yield text
+        finally:
+            self.last_metrics = metrics.finish()
+        if key:
+            self.cache.put(key, "".join(parts))
+
+    def generate_response(self, prompt: str, use_cache: bool = True, temperature: float = None,
+                          max_tokens: int = None, **parameters) -> str:
+        return "".join(self.stream_response(prompt, use_cache=use_cache, temperature=temperature,
+                                            max_tokens=max_tokens, **parameters))
 
-    def generate_response(self, prompt: str) -> str:
-        # Logic to interact with the GPT-4o model API
-        # This is a placeholder for the actual API call
-        response = f"Generated response for prompt: {prompt}"
-        return response
+    async def agenerate_response(self, prompt: str, use_cache: bool = True, temperature: float = None,
+                                 max_tokens: int = None, **parameters) -> str:
+        return "".join([text async for text in self.astream_response(
+            prompt, use_cache=use_cache, temperature=temperature, max_tokens=max_tokens, **parameters)])
 
     def set_model_parameters(self, parameters: dict):
-        # Logic to set model parameters if needed
-        pass
+        # Sent with every request, e.g. temperature or max_tokens
+        self.parameters.update(parameters)
 
     def get_model_info(self) -> dict:
         # Logic to retrieve model information
@@ -19,4 +206,4 @@ class GPT4OModel:
             "model_name": self.model_name,
             "api_key": self.api_key,
             "description": "GPT-4o model for generating responses."
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from config.settings import Config
+
+
+def make_key(model, parameters, messages):
+    # Everything that changes the completion: model, effective parameters and the full message list
+    payload = json.dumps({'model': model, 'parameters': parameters, 'messages': messages},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_deterministic(parameters):
+    # The API defaults to temperature 1, so only explicitly greedy requests repeat their output
+    return parameters.get('temperature') == 0 or parameters.get('top_p') == 0
+
+
+class ResponseCache:
+    """In-memory LRU of completions, bounded by entry count."""
+
+    def __init__(self, max_entries=None, only_deterministic=None):
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_MAX_ENTRIES
+        self.only_deterministic = (Config.RESPONSE_CACHE_ONLY_DETERMINISTIC
+                                   if only_deterministic is None else only_deterministic)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cacheable(self, parameters):
+        return not self.only_deterministic or is_deterministic(parameters)
+
+    def get(self, key):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = text
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+        }
+
+
+class DiskResponseCache(ResponseCache):
+    """On-disk variant: one JSON file per completion, evicted least-recently-used past ``max_bytes``.
+
+    Recency is the file's mtime (refreshed on every hit), so the order survives restarts and
+    several processes can share one directory. Every put rescans the directory before evicting,
+    so files written by other processes count towards ``max_bytes`` too. A put follows a model
+    call, so the scan is cheap next to it.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, only_deterministic=None):
+        super().__init__(only_deterministic=only_deterministic)
+        self.directory = directory or Config.RESPONSE_CACHE_DIR
+        self.max_bytes = max_bytes or Config.RESPONSE_CACHE_MAX_BYTES
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        # Must hold the lock (or be in __init__). Rebuilds the LRU order from the directory.
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, name[:-5], stat.st_size))
+        self._sizes = OrderedDict((key, size) for _, key, size in sorted(files))
+        self.bytes = sum(self._sizes.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            # Looked up on disk rather than in _sizes, so entries from other processes are hits too
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    text = json.load(f)['text']
+                os.utime(self._path(key))
+                size = os.path.getsize(self._path(key))
+            except (OSError, ValueError, KeyError):
+                # Never written, or removed or truncated by another process
+                self.bytes -= self._sizes.pop(key, 0)
+                self.misses += 1
+                return None
+            self.bytes += size - self._sizes.pop(key, 0)
+            self._sizes[key] = size
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        data = json.dumps({'text': text}, ensure_ascii=False).encode('utf-8')
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            self._scan()
+            if key in self._sizes:
+                # Newest even if another file has the same mtime
+                self._sizes.move_to_end(key)
+            while self.bytes > self.max_bytes and len(self._sizes) > 1:
+                old_key, size = self._sizes.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._scan()
+            for key in self._sizes:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._sizes.clear()
+            self.bytes = 0
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(entries=len(self._sizes), bytes=self.bytes)
+        return stats
+
+
+def build_response_cache():
+    # RESPONSE_CACHE: off, memory or disk
+    if Config.RESPONSE_CACHE == 'disk':
+        return DiskResponseCache()
+    if Config.RESPONSE_CACHE == 'memory':
+        return ResponseCache()
+    return None
@@ -1,5 +1,77 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import Config
+from transport.http_pool import get_async_http_pool, get_http_pool
+
+try:
+    import ijson
+except ImportError:  # Optional: incremental decoding falls back to response.json()
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+# Outcome of one query in a search_many batch; error is None on success
+SearchResult = namedtuple('SearchResult', ['query', 'documents', 'error', 'elapsed_ms'])
+
+# Index field types used for embeddings (e.g. text_vector in the RAG tutorial index)
+VECTOR_FIELD_TYPES = (
+    'Collection(Edm.Single)', 'Collection(Edm.Half)', 'Collection(Edm.Int16)',
+    'Collection(Edm.SByte)', 'Collection(Edm.Byte)',
+)
+
+_UNRESOLVED = object()
+
+
+class _DocumentStream:
+    # Rebuilds the documents of a search response from ijson events, one at a time.
+    # Events belonging to excluded fields never reach the builder, so those values
+    # are not materialized as Python objects.
+
+    PREFIX = 'value.item'
+
+    def __init__(self, exclude):
+        self.exclude = set(exclude or ())
+        self.builder = None
+
+    def feed(self, prefix, event, value):
+        if prefix == self.PREFIX:
+            if event == 'start_map':
+                self.builder = ijson.ObjectBuilder()
+            elif event == 'map_key' and value in self.exclude:
+                return None
+            if self.builder is None:
+                return None
+            self.builder.event(event, value)
+            if event == 'end_map':
+                document, self.builder = self.builder.value, None
+                return document
+            return None
+
+        if self.builder is None or not prefix.startswith(self.PREFIX + '.'):
+            return None
+        if prefix[len(self.PREFIX) + 1:].split('.', 1)[0] in self.exclude:
+            return None
+        self.builder.event(event, value)
+        return None
+
+
 class AzureSearch:
-    def __init__(self, search_service_name, index_name, api_key):
+    API_VERSION = "2021-04-30-Preview"
+    # 2024-07-01 is the first GA version with vectorQueries of kind "text" (server-side vectorizer);
+    # only hybrid and vector searches use it, so plain keyword requests are unchanged
+    VECTOR_API_VERSION = "2024-07-01"
+    MODES = ('keyword', 'hybrid', 'vector')
+    # Seconds before a schema lookup that failed for reasons other than 401/403 is retried
+    SELECT_RETRY_SECONDS = 60
+
+    def __init__(self, search_service_name, index_name, api_key, http_pool=None,
+                 select=None, vector_fields=None, stream_decode=None, reranker=None):
         self.search_service_name = search_service_name
         self.index_name = index_name
         self.api_key = api_key
@@ -8,19 +80,282 @@ class AzureSearch:
             "Content-Type": "application/json",
             "api-key": api_key
         }
+        # Reuse pooled keep-alive connections instead of a new handshake per query
+        self.http = http_pool or self._default_http_pool()
+        # Fields returned when the caller does not pass select (None = resolve from the index schema)
+        self._default_select = select or Config.AZURE_SEARCH_SELECT or _UNRESOLVED
+        self._select_retry_at = 0.0
+        # Concurrent first searches share one schema lookup
+        self._select_lock = threading.Lock()
+        # Fields queried by vectorQueries, in order; vector_fields also grows from the index schema
+        self.vector_query_fields = list(vector_fields or Config.AZURE_SEARCH_VECTOR_FIELDS)
+        self.vector_fields = set(self.vector_query_fields)
+        if stream_decode is None:
+            stream_decode = Config.AZURE_SEARCH_STREAM_DECODE
+        self.stream_decode = stream_decode and ijson is not None
+        # Optional reranker(search_text, documents) -> documents, applied to at most rerank_top candidates
+        self.reranker = reranker
+
+    def _default_http_pool(self):
+        return get_http_pool()
+
+    def _index_url(self):
+        return f"{self.endpoint}/indexes/{self.index_name}?api-version={self.API_VERSION}"
+
+    def _search_url(self, mode='keyword'):
+        api_version = self.API_VERSION if mode == 'keyword' else self.VECTOR_API_VERSION
+        return f"{self.endpoint}/indexes/{self.index_name}/docs/search?api-version={api_version}"
+
+    def _index_docs_url(self):
+        return f"{self.endpoint}/indexes/{self.index_name}/docs/index?api-version={self.API_VERSION}"
+
+    def _document_url(self, document_id):
+        return f"{self.endpoint}/indexes/{self.index_name}/docs/{document_id}?api-version={self.API_VERSION}"
+
+    def _select_from_schema(self, index):
+        fields = index.get('fields', [])
+        self.vector_fields.update(
+            field['name'] for field in fields
+            if field.get('type') in VECTOR_FIELD_TYPES or field.get('dimensions')
+        )
+        return [
+            field['name'] for field in fields
+            if field.get('retrievable', True) and field['name'] not in self.vector_fields
+        ]
+
+    def _select_pending(self):
+        return self._default_select is _UNRESOLVED and time.monotonic() >= self._select_retry_at
+
+    def _current_select(self):
+        return None if self._default_select is _UNRESOLVED else self._default_select
+
+    def _resolve_select(self, status, index, error=None):
+        # status is None when the schema request itself failed with error
+        if status == 200:
+            self._default_select = self._select_from_schema(index)
+        elif status in (401, 403):
+            # Reading the schema needs an admin key. With a query key searches return full
+            # documents; set AZURE_SEARCH_SELECT to trim them without the lookup.
+            logger.warning("Schema of index %s not readable (HTTP %s); searches return full documents. "
+                           "Set AZURE_SEARCH_SELECT to limit the returned fields.", self.index_name, status)
+            self._default_select = None
+        else:
+            logger.warning("Schema lookup for index %s failed (%s); retrying in %ss", self.index_name,
+                           error if status is None else f"HTTP {status}", self.SELECT_RETRY_SECONDS)
+            self._select_retry_at = time.monotonic() + self.SELECT_RETRY_SECONDS
+        return self._current_select()
+
+    def default_select(self):
+        # Every retrievable non-vector field, from AZURE_SEARCH_SELECT or the index schema
+        if not self._select_pending():
+            return self._current_select()
+        with self._select_lock:
+            if not self._select_pending():
+                return self._current_select()
+            try:
+                response = self.http.get(self._index_url(), headers=self.headers)
+                status = response.status_code
+                index = response.json() if status == 200 else None
+            except Exception as e:
+                return self._resolve_select(None, None, e)
+            return self._resolve_select(status, index)
 
-    def search_documents(self, search_text, top=10):
-        search_url = f"{self.endpoint}/indexes/{self.index_name}/docs/search?api-version=2021-04-30-Preview"
-        search_body = {
-            "search": search_text,
-            "top": top
+    def _retrieval_options(self, top, mode, k, exhaustive, rerank_top):
+        mode = mode or Config.AZURE_SEARCH_MODE
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid search mode: {mode}")
+        if rerank_top is None:
+            rerank_top = Config.AZURE_SEARCH_RERANK_TOP
+        # Without a reranker there is nothing to spend a larger candidate window on
+        fetch_top = max(top, rerank_top or 0) if self.reranker else top
+        return {
+            'mode': mode,
+            'k': max(k or Config.AZURE_SEARCH_VECTOR_K, fetch_top),
+            'exhaustive': Config.AZURE_SEARCH_EXHAUSTIVE if exhaustive is None else exhaustive,
+            'fetch_top': fetch_top,
         }
-        response = requests.post(search_url, headers=self.headers, json=search_body)
-        response.raise_for_status()
-        return response.json().get('value', [])
+
+    def _search_body(self, search_text, top, select, search_fields, retrieval=None):
+        retrieval = retrieval or {'mode': 'keyword'}
+        search_body = {"top": top}
+        if retrieval['mode'] != 'vector':
+            search_body["search"] = search_text
+        if retrieval['mode'] != 'keyword':
+            # The index vectorizer embeds the text server-side, so no embedding call is made here
+            search_body["vectorQueries"] = [{
+                "kind": "text",
+                "text": search_text,
+                "fields": ", ".join(self.vector_query_fields),
+                "k": retrieval['k'],
+                "exhaustive": retrieval['exhaustive'],
+            }]
+        if select:
+            search_body["select"] = select if isinstance(select, str) else ", ".join(select)
+        if search_fields:
+            search_body["searchFields"] = search_fields if isinstance(search_fields, str) else ", ".join(search_fields)
+        return search_body
+
+    def _strip_vectors(self, documents, exclude_vectors):
+        if not exclude_vectors or not self.vector_fields:
+            return documents
+        return [
+            {name: value for name, value in document.items() if name not in self.vector_fields}
+            for document in documents
+        ]
+
+    def _decode_documents(self, response, exclude):
+        if not self.stream_decode:
+            return response.json().get('value', [])
+        # Parse the body incrementally instead of holding the raw text and the full tree
+        response.raw.decode_content = True
+        stream = _DocumentStream(exclude)
+        documents = []
+        for prefix, event, value in ijson.parse(response.raw, use_float=True):
+            document = stream.feed(prefix, event, value)
+            if document is not None:
+                documents.append(document)
+        return documents
+
+    def _rerank(self, search_text, documents, top):
+        if self.reranker and len(documents) > 1:
+            documents = self.reranker(search_text, documents)
+        return documents[:top]
+
+    def search_documents(self, search_text, top=10, select=None, search_fields=None, exclude_vectors=True,
+                         mode=None, k=None, exhaustive=None, rerank_top=None):
+        # mode: 'keyword', 'hybrid' or 'vector'; k and exhaustive tune the vector leg (recall vs latency)
+        retrieval = self._retrieval_options(top, mode, k, exhaustive, rerank_top)
+        if select is None and exclude_vectors:
+            select = self.default_select()
+        search_body = self._search_body(search_text, retrieval['fetch_top'], select, search_fields, retrieval)
+        exclude = self.vector_fields if exclude_vectors else ()
+        response = self.http.post(self._search_url(retrieval['mode']), headers=self.headers, json=search_body,
+                                  stream=self.stream_decode)
+        try:
+            response.raise_for_status()
+            documents = self._decode_documents(response, exclude)
+        finally:
+            response.close()
+        return self._rerank(search_text, self._strip_vectors(documents, exclude_vectors), top)
+
+    def _timed_search(self, search_text, top, options):
+        start = time.perf_counter()
+        try:
+            documents, error = self.search_documents(search_text, top=top, **options), None
+        except Exception as e:
+            documents, error = [], e
+        return SearchResult(search_text, documents, error, (time.perf_counter() - start) * 1000)
+
+    def _concurrency(self, queries, max_concurrency):
+        # One in-flight query per pooled connection unless the caller says otherwise
+        pool_maxsize = getattr(self.http, 'pool_maxsize', Config.HTTP_POOL_MAXSIZE)
+        return max_concurrency or min(len(queries), pool_maxsize)
+
+    def search_many(self, queries, top=10, max_concurrency=None, **options):
+        # Runs the queries concurrently over the shared pool; results keep the input order
+        queries = list(queries)
+        if not queries:
+            return []
+        with ThreadPoolExecutor(max_workers=self._concurrency(queries, max_concurrency)) as executor:
+            return list(executor.map(lambda query: self._timed_search(query, top, options), queries))
 
     def get_document_by_id(self, document_id):
-        search_url = f"{self.endpoint}/indexes/{self.index_name}/docs/{document_id}?api-version=2021-04-30-Preview"
-        response = requests.get(search_url, headers=self.headers)
+        response = self.http.get(self._document_url(document_id), headers=self.headers)
+        response.raise_for_status()
+        return response.json()
+
+    def index_documents(self, actions):
+        # Bulk upload/merge/delete; returns one {key, status, errorMessage, statusCode} per action.
+        # A 207 means some actions failed, so callers must check each status.
+        response = self.http.post(self._index_docs_url(), headers=self.headers, json={"value": actions})
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return response.json()['value']
+
+
+class AsyncAzureSearch(AzureSearch):
+    """Same API as ``AzureSearch`` with awaitable methods, backed by the shared aiohttp pool."""
+
+    _select_async_locks = None
+
+    def _default_http_pool(self):
+        return get_async_http_pool()
+
+    def _select_async_lock(self):
+        # An asyncio.Lock belongs to the loop it is first used on, and the pool keeps one
+        # session per loop, so each loop gets its own lock as well
+        loop = asyncio.get_running_loop()
+        with self._select_lock:
+            if self._select_async_locks is None:
+                self._select_async_locks = weakref.WeakKeyDictionary()
+            lock = self._select_async_locks.get(loop)
+            if lock is None:
+                lock = self._select_async_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def default_select(self):
+        if not self._select_pending():
+            return self._current_select()
+        async with self._select_async_lock():
+            if not self._select_pending():
+                return self._current_select()
+            try:
+                async with self.http.get(self._index_url(), headers=self.headers) as response:
+                    status = response.status
+                    index = await response.json() if status == 200 else None
+            except Exception as e:
+                return self._resolve_select(None, None, e)
+            return self._resolve_select(status, index)
+
+    async def _decode_documents(self, response, exclude):
+        if not self.stream_decode:
+            return (await response.json()).get('value', [])
+        stream = _DocumentStream(exclude)
+        documents = []
+        async for prefix, event, value in ijson.parse_async(response.content, use_float=True):
+            document = stream.feed(prefix, event, value)
+            if document is not None:
+                documents.append(document)
+        return documents
+
+    async def search_documents(self, search_text, top=10, select=None, search_fields=None, exclude_vectors=True,
+                               mode=None, k=None, exhaustive=None, rerank_top=None):
+        retrieval = self._retrieval_options(top, mode, k, exhaustive, rerank_top)
+        if select is None and exclude_vectors:
+            select = await self.default_select()
+        search_body = self._search_body(search_text, retrieval['fetch_top'], select, search_fields, retrieval)
+        exclude = self.vector_fields if exclude_vectors else ()
+        async with self.http.post(self._search_url(retrieval['mode']), headers=self.headers,
+                                  json=search_body) as response:
+            response.raise_for_status()
+            documents = await self._decode_documents(response, exclude)
+        return self._rerank(search_text, self._strip_vectors(documents, exclude_vectors), top)
+
+    async def _timed_search(self, search_text, top, options):
+        start = time.perf_counter()
+        try:
+            documents, error = await self.search_documents(search_text, top=top, **options), None
+        except Exception as e:
+            documents, error = [], e
+        return SearchResult(search_text, documents, error, (time.perf_counter() - start) * 1000)
+
+    async def search_many(self, queries, top=10, max_concurrency=None, **options):
+        queries = list(queries)
+        if not queries:
+            return []
+        semaphore = asyncio.Semaphore(self._concurrency(queries, max_concurrency))
+
+        async def bounded(query):
+            async with semaphore:
+                return await self._timed_search(query, top, options)
+
+        return await asyncio.gather(*[bounded(query) for query in queries])
+
+    async def get_document_by_id(self, document_id):
+        async with self.http.get(self._document_url(document_id), headers=self.headers) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def index_documents(self, actions):
+        async with self.http.post(self._index_docs_url(), headers=self.headers, json={"value": actions}) as response:
+            response.raise_for_status()
+            return (await response.json())['value']
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from config.settings import Config
+
+
+def chunk_text(text, chunk_size=None, overlap=None):
+    # Generator over overlapping chunks, cut on sentence/word boundaries like the SplitSkill "pages" mode
+    chunk_size = chunk_size or Config.INGEST_CHUNK_SIZE
+    overlap = Config.INGEST_CHUNK_OVERLAP if overlap is None else overlap
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            cut = max(text.rfind('. ', start, end), text.rfind('\n', start, end))
+            if cut <= start + overlap:
+                cut = text.rfind(' ', start, end)
+            if cut > start + overlap:
+                end = cut + 1
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+
+
+def iter_text_documents(directory, extensions=('.txt', '.md')):
+    # Yields {parent_id, title, content} for each text file under directory, one file at a time
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.lower().endswith(extensions):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                yield {
+                    'parent_id': os.path.relpath(path, directory).replace(os.sep, '/'),
+                    'title': name,
+                    'content': f.read(),
+                }
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """Local record of what is already in the index: a content hash and the chunk ids of each document."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.documents = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.documents = json.load(f)
+
+    def entry(self, parent_id):
+        return self.documents.setdefault(parent_id, {'hash': None, 'chunks': []})
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.documents, f)
+        os.replace(tmp_path, self.path)
+
+
+class IngestionPipeline:
+    """Incremental chunk -> hash -> embed -> upload pipeline in front of ``AzureSearch.index_documents``.
+
+    Chunk ids are derived from the parent id and the chunk's content hash, so a chunk that
+    is already listed in the manifest is neither embedded nor uploaded again, even if an
+    edit earlier in the document moved it. Chunks that disappeared are deleted from the
+    index. New chunks are embedded and uploaded in batches of ``batch_size``, and the
+    manifest is saved after every batch so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, search, manifest=None, embed_batch=None, batch_size=None,
+                 chunk_size=None, chunk_overlap=None, vector_field=None):
+        self.search = search
+        self.manifest = manifest or IngestionManifest(Config.INGEST_MANIFEST_PATH)
+        # embed_batch(list[str]) -> list[list[float]]; without it chunks are uploaded keyword-only
+        self.embed_batch = embed_batch
+        self.batch_size = batch_size or Config.INGEST_BATCH_SIZE
+        self.chunk_size = chunk_size or Config.INGEST_CHUNK_SIZE
+        self.chunk_overlap = Config.INGEST_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        self.vector_field = vector_field or Config.AZURE_SEARCH_VECTOR_FIELDS[0]
+        self._pending = []
+        self._open_documents = {}
+        self.stats = dict.fromkeys((
+            'documents', 'documents_unchanged', 'chunks', 'chunks_unchanged',
+            'chunks_uploaded', 'chunks_deleted', 'chunks_failed', 'batches',
+        ), 0)
+
+    def run(self, documents, prune=False):
+        """Ingest an iterable of ``{parent_id, title, content[, locations]}`` dicts.
+
+        With ``prune`` set, documents in the manifest that were not seen in this run
+        are removed from the index as well.
+        """
+        seen = set()
+        for document in documents:
+            seen.add(document['parent_id'])
+            self.add_document(document)
+        if prune:
+            for parent_id in [p for p in self.manifest.documents if p not in seen]:
+                self.remove_document(parent_id)
+        self.flush()
+        return dict(self.stats)
+
+    def add_document(self, document):
+        parent_id = document['parent_id']
+        if parent_id in self._open_documents:
+            self.flush()
+        title = document.get('title', '')
+        self.stats['documents'] += 1
+
+        document_hash = _sha256(title, document['content'])
+        entry = self.manifest.entry(parent_id)
+        if entry['hash'] == document_hash:
+            self.stats['documents_unchanged'] += 1
+            return
+
+        parent_key = _sha256(parent_id)[:16]
+        known = set(entry['chunks'])
+        current = set()
+        actions = []
+        for chunk in chunk_text(document['content'], self.chunk_size, self.chunk_overlap):
+            chunk_id = f"{parent_key}_{_sha256(title, chunk)[:32]}"
+            if chunk_id in current:
+                continue
+            current.add(chunk_id)
+            self.stats['chunks'] += 1
+            if chunk_id in known:
+                self.stats['chunks_unchanged'] += 1
+                continue
+            action = {
+                '@search.action': 'mergeOrUpload',
+                'chunk_id': chunk_id,
+                'parent_id': parent_id,
+                'title': title,
+                'chunk': chunk,
+            }
+            if 'locations' in document:
+                action['locations'] = document['locations']
+            actions.append(action)
+
+        actions.extend({'@search.action': 'delete', 'chunk_id': chunk_id} for chunk_id in known - current)
+        self._queue(parent_id, document_hash, actions)
+
+    def remove_document(self, parent_id):
+        if parent_id in self._open_documents:
+            self.flush()
+        entry = self.manifest.entry(parent_id)
+        self._queue(parent_id, None, [{'@search.action': 'delete', 'chunk_id': c} for c in entry['chunks']])
+
+    def _queue(self, parent_id, document_hash, actions):
+        # The document hash is only committed once every action for it has succeeded
+        self._open_documents[parent_id] = {'hash': document_hash, 'remaining': len(actions), 'failed': False}
+        if not actions:
+            self._close_document(parent_id)
+        for action in actions:
+            self._pending.append((parent_id, action))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def _close_document(self, parent_id):
+        state = self._open_documents.pop(parent_id)
+        entry = self.manifest.entry(parent_id)
+        if state['failed']:
+            entry['hash'] = None
+        elif state['hash'] is None:
+            del self.manifest.documents[parent_id]
+        else:
+            entry['hash'] = state['hash']
+
+    def flush(self):
+        if not self._pending:
+            self.manifest.save()
+            return
+        batch, self._pending = self._pending, []
+
+        uploads = [action for _, action in batch if action['@search.action'] != 'delete']
+        if uploads and self.embed_batch is not None:
+            try:
+                vectors = self.embed_batch([action['chunk'] for action in uploads])
+            except BaseException:
+                # Nothing was sent: keep the batch queued so its documents stay open and a retry resends it
+                self._pending = batch + self._pending
+                raise
+            for action, vector in zip(uploads, vectors):
+                action[self.vector_field] = [float(x) for x in vector]
+
+        results = {}
+        try:
+            results = {result['key']: result for result in self.search.index_documents([a for _, a in batch])}
+        finally:
+            self.stats['batches'] += 1
+            self._record(batch, results)
+            self.manifest.save()
+
+    def _record(self, batch, results):
+        for parent_id, action in batch:
+            entry = self.manifest.entry(parent_id)
+            state = self._open_documents[parent_id]
+            result = results.get(action['chunk_id'])
+            # Deleting a key that is already gone is reported as success (or 404) by the service
+            deleted = action['@search.action'] == 'delete'
+            if result and (result.get('status') or (deleted and result.get('statusCode') == 404)):
+                if deleted:
+                    entry['chunks'] = [c for c in entry['chunks'] if c != action['chunk_id']]
+                    self.stats['chunks_deleted'] += 1
+                else:
+                    entry['chunks'].append(action['chunk_id'])
+                    self.stats['chunks_uploaded'] += 1
+            else:
+                state['failed'] = True
+                self.stats['chunks_failed'] += 1
+            state['remaining'] -= 1
+            if state['remaining'] == 0:
+                self._close_document(parent_id)
@@ -0,0 +1,191 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from config.settings import Config
+from rag.azure_search import SearchResult
+
+
+class LocalVectorIndex:
+    """In-process retriever with the same search API as ``AzureSearch``.
+
+    Chunk embeddings are kept as one L2-normalized float32 matrix (optionally a
+    memory-mapped ``.npy`` file), so cosine similarity for a batch of queries is a
+    single matrix product. ``build_ivf()`` adds an approximate inverted-file index
+    that only scores the chunks in the ``nprobe`` closest clusters.
+    """
+
+    VECTORS_FILE = 'vectors.npy'
+    DOCUMENTS_FILE = 'documents.jsonl'
+
+    def __init__(self, documents, vectors, embed=None, key_field='chunk_id', nprobe=None):
+        self.documents = list(documents)
+        self.vectors = vectors
+        if len(self.documents) != len(self.vectors):
+            raise ValueError("documents and vectors must have the same length")
+        # embed(text) -> list[float]; must be the model that produced the chunk vectors
+        self.embed = embed
+        self.key_field = key_field
+        self.nprobe = nprobe or Config.LOCAL_INDEX_NPROBE
+        self._positions = {document.get(key_field): i for i, document in enumerate(self.documents)}
+        self.centroids = None
+        self.lists = None
+
+    @staticmethod
+    def _normalize(matrix):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @classmethod
+    def from_chunks(cls, chunks, embed=None, vector_field=None, **kwargs):
+        # Chunks are index documents from the split/embedding pipeline:
+        # chunk_id, parent_id, title, chunk, locations, text_vector
+        vector_field = vector_field or Config.AZURE_SEARCH_VECTOR_FIELDS[0]
+        documents, vectors = [], []
+        for chunk in chunks:
+            document = {name: value for name, value in chunk.items() if name != vector_field}
+            vector = chunk.get(vector_field)
+            if vector is None:
+                if embed is None:
+                    raise ValueError(f"Chunk {document.get('chunk_id')} has no {vector_field}")
+                vector = embed(document.get('chunk', ''))
+            documents.append(document)
+            vectors.append(vector)
+        return cls(documents, cls._normalize(vectors), embed=embed, **kwargs)
+
+    @classmethod
+    def load_export(cls, path, embed=None, **kwargs):
+        # Accepts JSON Lines, a JSON list, or a search/index payload of the form {"value": [...]}
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                chunks = [json.loads(line) for line in f if line.strip()]
+            else:
+                chunks = json.load(f)
+        if isinstance(chunks, dict):
+            chunks = chunks['value']
+        return cls.from_chunks(chunks, embed=embed, **kwargs)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, self.VECTORS_FILE), np.ascontiguousarray(self.vectors))
+        with open(os.path.join(directory, self.DOCUMENTS_FILE), 'w', encoding='utf-8') as f:
+            for document in self.documents:
+                f.write(json.dumps(document) + '\n')
+
+    @classmethod
+    def load(cls, directory, embed=None, mmap=None, **kwargs):
+        # With mmap the OS pages vectors in on demand instead of reading the whole matrix
+        mmap = Config.LOCAL_INDEX_MMAP if mmap is None else mmap
+        vectors = np.load(os.path.join(directory, cls.VECTORS_FILE), mmap_mode='r' if mmap else None)
+        with open(os.path.join(directory, cls.DOCUMENTS_FILE), 'r', encoding='utf-8') as f:
+            documents = [json.loads(line) for line in f if line.strip()]
+        return cls(documents, vectors, embed=embed, **kwargs)
+
+    def build_ivf(self, nlist=None, iterations=10, seed=0):
+        # Spherical k-means over (a sample of) the vectors; each chunk is listed under its closest centroid
+        count = len(self.vectors)
+        if count == 0:
+            # Nothing to cluster; searches stay exhaustive
+            return self
+        nlist = min(nlist or max(int(np.sqrt(count)), 1), count)
+        rng = np.random.default_rng(seed)
+        sample = self.vectors[np.sort(rng.choice(count, size=min(count, nlist * 64), replace=False))]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+
+        assignment = np.concatenate([
+            np.argmax(self.vectors[start:start + 65536] @ centroids.T, axis=1)
+            for start in range(0, count, 65536)
+        ])
+        self.centroids = centroids
+        self.lists = [np.flatnonzero(assignment == c) for c in range(nlist)]
+        return self
+
+    @staticmethod
+    def _top(scores, top):
+        top = min(top, len(scores))
+        if top <= 0:
+            return np.empty(0, dtype=np.int64)
+        best = np.argpartition(-scores, top - 1)[:top]
+        return best[np.argsort(-scores[best])]
+
+    def _search_matrix(self, queries, top, exhaustive):
+        if exhaustive or self.centroids is None:
+            hits = []
+            for row in queries @ self.vectors.T:
+                best = self._top(row, top)
+                hits.append((best, row[best]))
+            return hits
+
+        hits = []
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :self.nprobe]
+        for query, probe in zip(queries, probes):
+            candidates = np.concatenate([self.lists[c] for c in probe])
+            scores = self.vectors[candidates] @ query
+            best = self._top(scores, top)
+            hits.append((candidates[best], scores[best]))
+        return hits
+
+    def _documents(self, positions, scores, select):
+        if isinstance(select, str):
+            select = [name.strip() for name in select.split(',')]
+        documents = []
+        for position, score in zip(positions, scores):
+            document = self.documents[position]
+            if select:
+                document = {name: document[name] for name in select if name in document}
+            documents.append({'@search.score': float(score), **document})
+        return documents
+
+    def search_vectors(self, vectors, top=10, select=None, exhaustive=None):
+        # One list of documents per query vector, best match first
+        queries = self._normalize(np.atleast_2d(vectors))
+        return [
+            self._documents(positions, scores, select)
+            for positions, scores in self._search_matrix(queries, top, exhaustive)
+        ]
+
+    def _embed(self, search_text):
+        if self.embed is None:
+            raise ValueError("LocalVectorIndex needs an embed callable to search by text")
+        return self.embed(search_text)
+
+    def search_documents(self, search_text, top=10, select=None, exclude_vectors=True, exhaustive=None, **options):
+        # Other AzureSearch options (mode, k, search_fields, ...) have no local equivalent
+        return self.search_vectors([self._embed(search_text)], top=top, select=select, exhaustive=exhaustive)[0]
+
+    def search_many(self, queries, top=10, max_concurrency=None, select=None, exhaustive=None, **options):
+        # Embeds each query, then scores the whole batch with one matrix product
+        # elapsed_ms is the query's own embedding time plus the shared scoring pass it waited for
+        queries = list(queries)
+        vectors, errors, embed_ms = [], {}, []
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            try:
+                vectors.append(self._embed(query))
+            except Exception as e:
+                errors[i] = e
+            embed_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        batches = iter(self.search_vectors(vectors, top=top, select=select, exhaustive=exhaustive) if vectors else [])
+        search_ms = (time.perf_counter() - start) * 1000
+        return [
+            SearchResult(query, [], errors[i], embed_ms[i]) if i in errors
+            else SearchResult(query, next(batches), None, embed_ms[i] + search_ms)
+            for i, query in enumerate(queries)
+        ]
+
+    def get_document_by_id(self, document_id):
+        if document_id not in self._positions:
+            raise KeyError(f"Document not found: {document_id}")
+        return self.documents[self._positions[document_id]]
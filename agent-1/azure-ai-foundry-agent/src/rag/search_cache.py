@@ -0,0 +1,240 @@
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config.settings import Config
+from rag.azure_search import SearchResult
+
+
+class SearchResultCache:
+    """Result cache for Azure Search queries.
+
+    Lookups go through up to three tiers:
+    - exact match on the normalized query text, ``top`` and the search options
+    - optional embedding similarity, when an ``embed(text) -> list[float]`` callable is given
+    - TTL expiry, plus ``invalidate()`` for when the index is rebuilt
+
+    Query embeddings are rows of one float32 matrix, so the similarity tier scores every
+    entry with a single matrix-vector product. Results are copied on the way in and out,
+    so callers can modify what they get back. A ``ttl`` or ``max_entries`` of 0 disables
+    caching.
+    """
+
+    def __init__(self, ttl=None, max_entries=None, embed=None, similarity_threshold=None):
+        self.ttl = Config.SEARCH_CACHE_TTL if ttl is None else ttl
+        self.max_entries = Config.SEARCH_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.embed = embed
+        self.similarity_threshold = (Config.SEARCH_CACHE_SIMILARITY if similarity_threshold is None
+                                     else similarity_threshold)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Similarity tier: one matrix row per embedded entry, plus per-row expiry, key and
+        # (top, options) group so a lookup can mask out the rows it must not match
+        self._matrix = None
+        self._row_expires = None
+        self._row_group = None
+        self._row_keys = []
+        self._groups = {}
+        self._free = []
+        self._rows_used = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    @staticmethod
+    def normalize(text):
+        text = re.sub(r'\s+', ' ', text.strip().lower())
+        return text.strip(' ?!.')
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def options_key(options):
+        # Options that change the results (select, mode, k, ...) are part of the key;
+        # unset ones are dropped so they share the entry of a default query
+        return tuple(sorted((name, repr(value)) for name, value in (options or {}).items() if value is not None))
+
+    def _key(self, search_text, top, options):
+        return self.normalize(search_text), top, self.options_key(options)
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _hit(self, entry, semantic):
+        if semantic:
+            self.semantic_hits += 1
+        else:
+            self.exact_hits += 1
+        self.saved_ms += entry['fetch_ms']
+        return entry['documents']
+
+    def _group(self, key):
+        return self._groups.setdefault(key[1:], len(self._groups))
+
+    def _store_vector(self, key, vector):
+        # Called with self._lock held. Returns the row holding the vector.
+        if self._matrix is None:
+            rows = min(self.max_entries, 1024)
+            self._matrix = np.zeros((rows, len(vector)), dtype=np.float32)
+            self._row_expires = np.full(rows, -np.inf)
+            self._row_group = np.zeros(rows, dtype=np.int64)
+            self._row_keys = [None] * rows
+        elif len(vector) != self._matrix.shape[1]:
+            raise ValueError(f"Expected a {self._matrix.shape[1]}-dimension embedding, got {len(vector)}")
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = self._rows_used
+            self._rows_used += 1
+            if row >= len(self._matrix):
+                # Grow geometrically up to max_entries rows
+                rows = min(len(self._matrix) * 2, self.max_entries)
+                grown = np.zeros((rows, self._matrix.shape[1]), dtype=np.float32)
+                grown[:len(self._matrix)] = self._matrix
+                self._matrix = grown
+                self._row_expires = np.concatenate([self._row_expires,
+                                                    np.full(rows - len(self._row_expires), -np.inf)])
+                self._row_group = np.concatenate([self._row_group,
+                                                  np.zeros(rows - len(self._row_group), dtype=np.int64)])
+                self._row_keys.extend([None] * (rows - len(self._row_keys)))
+        self._matrix[row] = vector
+        self._row_group[row] = self._group(key)
+        self._row_keys[row] = key
+        return row
+
+    def _drop(self, key):
+        # Called with self._lock held
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry['row'] is not None:
+            self._row_expires[entry['row']] = -np.inf
+            self._row_keys[entry['row']] = None
+            self._free.append(entry['row'])
+
+    def get(self, search_text, top, options=None):
+        # Returns (documents, query_vector); documents is None on a miss
+        if not self.enabled:
+            with self._lock:
+                self.misses += 1
+            return None, None
+        key = self._key(search_text, top, options)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['expires_at'] > now:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(self._hit(entry, semantic=False)), None
+            if entry:
+                self._drop(key)
+
+        if self.embed is None:
+            with self._lock:
+                self.misses += 1
+            return None, None
+
+        vector = self._unit(self.embed(key[0]))
+        with self._lock:
+            group = self._groups.get(key[1:])
+            if self._matrix is not None and group is not None:
+                if len(vector) != self._matrix.shape[1]:
+                    raise ValueError(f"Expected a {self._matrix.shape[1]}-dimension embedding, got {len(vector)}")
+                scores = self._matrix @ vector
+                # Free rows have expiry -inf, so the expiry mask drops them as well
+                scores[(self._row_group != group) | (self._row_expires <= now)] = -np.inf
+                row = int(np.argmax(scores))
+                if scores[row] >= self.similarity_threshold:
+                    return copy.deepcopy(self._hit(self._entries[self._row_keys[row]], semantic=True)), vector
+            self.misses += 1
+        return None, vector
+
+    def put(self, search_text, top, documents, fetch_ms=0.0, vector=None, options=None):
+        if not self.enabled:
+            return
+        key = self._key(search_text, top, options)
+        if self.embed is not None and vector is None:
+            vector = self._unit(self.embed(key[0]))
+        documents = copy.deepcopy(documents)
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._drop(key)
+            # Evict first, so the new entry's vector can take a freed row
+            while len(self._entries) >= self.max_entries:
+                self._drop(next(iter(self._entries)))
+            row = None if vector is None else self._store_vector(key, vector)
+            if row is not None:
+                self._row_expires[row] = expires_at
+            self._entries[key] = {
+                'documents': documents,
+                'row': row,
+                'fetch_ms': fetch_ms,
+                'expires_at': expires_at,
+            }
+
+    def invalidate(self):
+        # Call after the index is rebuilt or re-ingested
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self):
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            'exact_hits': self.exact_hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+            'saved_ms': round(self.saved_ms, 1),
+            'entries': len(self._entries),
+        }
+
+class CachedSearch:
+    """Puts a ``SearchResultCache`` in front of any backend with ``search_documents``."""
+
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache or SearchResultCache()
+
+    def search_documents(self, search_text, top=10, **options):
+        documents, vector = self.cache.get(search_text, top, options)
+        if documents is not None:
+            return documents
+        start = time.perf_counter()
+        documents = self.backend.search_documents(search_text, top=top, **options)
+        self.cache.put(search_text, top, documents, (time.perf_counter() - start) * 1000, vector, options)
+        return documents
+
+    def search_many(self, queries, top=10, max_concurrency=None, **options):
+        # Serve cached queries locally and only fan the misses out to the backend
+        queries = list(queries)
+        results = [None] * len(queries)
+        misses = []
+        for i, query in enumerate(queries):
+            documents, vector = self.cache.get(query, top, options)
+            if documents is not None:
+                results[i] = SearchResult(query, documents, None, 0.0)
+            else:
+                misses.append((i, query, vector))
+
+        if misses:
+            fetched = self.backend.search_many([query for _, query, _ in misses], top=top,
+                                               max_concurrency=max_concurrency, **options)
+            for (i, query, vector), result in zip(misses, fetched):
+                if result.error is None:
+                    self.cache.put(query, top, result.documents, result.elapsed_ms, vector, options)
+                results[i] = result
+        return results
+
+    def invalidate(self):
+        self.cache.invalidate()
+
+    def __getattr__(self, name):
+        # Everything else (get_document_by_id, ...) goes straight to the backend
+        return getattr(self.backend, name)
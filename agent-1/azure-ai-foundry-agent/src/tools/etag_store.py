@@ -0,0 +1,137 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import weakref
+
+from config.settings import Config
+
+
+def _flush_at_exit(ref):
+    # Holds only a weak reference, so registering does not keep the store alive
+    store = ref()
+    if store is not None:
+        store.flush()
+
+
+class ETagStore:
+    """Remembers ETags and response bodies for conditional GitHub GETs.
+
+    GitHub answers ``If-None-Match`` with ``304 Not Modified`` when nothing changed, and
+    304s do not count against the rate limit. Entries are keyed by URL and a hash of the
+    token, so callers with different scopes never share bodies. With ``path`` set, entries
+    are persisted to a JSON file and survive restarts. Changes are written at most once per
+    ``persist_interval`` seconds (and at exit); ``flush()`` writes them immediately.
+    """
+
+    def __init__(self, path=None, max_entries=1024, persist_interval=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.persist_interval = (Config.GITHUB_ETAG_PERSIST_INTERVAL
+                                 if persist_interval is None else persist_interval)
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Serializes file writes, so an older snapshot never replaces a newer one
+        self._persist_lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        if path and os.path.exists(path):
+            self._entries = self._load(path, max_entries)
+        if path:
+            atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @staticmethod
+    def _load(path, max_entries):
+        # A corrupt or partly written file only costs the cached bodies, so start empty
+        try:
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading ETag cache {path}, starting empty: {e}")
+            return {}
+        if not isinstance(entries, dict):
+            print(f"Error loading ETag cache {path}, starting empty: expected a JSON object")
+            return {}
+        entries = {key: entry for key, entry in entries.items()
+                   if isinstance(entry, dict) and 'etag' in entry and 'body' in entry}
+        # The file keeps insertion order, so the newest entries are the last ones
+        keys = list(entries)[-max_entries:] if max_entries > 0 else []
+        return {key: entries[key] for key in keys}
+
+    @staticmethod
+    def make_key(url, token):
+        scope = hashlib.sha256((token or '').encode('utf-8')).hexdigest()[:16]
+        return f"{scope}:{url}"
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return (entry['etag'], entry['body']) if entry else (None, None)
+
+    def put(self, key, etag, body):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {'etag': etag, 'body': body}
+            # dicts keep insertion order, so the first key is the oldest entry
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._mark_dirty()
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._mark_dirty()
+
+    def record(self, not_modified, body=None):
+        with self._lock:
+            self.requests += 1
+            if not_modified:
+                self.not_modified += 1
+                self.bytes_saved += len(body.encode('utf-8'))
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+            'bytes_saved': self.bytes_saved,
+            # Every 304 is a request GitHub did not charge against the rate limit
+            'quota_saved': self.not_modified,
+            'entries': len(self._entries),
+        }
+
+    def _mark_dirty(self):
+        # Called with self._lock held
+        if not self.path:
+            return
+        self._dirty = True
+        if self.persist_interval <= 0:
+            self._persist(json.dumps(self._entries))
+            self._dirty = False
+        elif self._timer is None:
+            self._timer = threading.Timer(self.persist_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._persist_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                snapshot = json.dumps(self._entries)
+            self._persist(snapshot)
+
+    def _persist(self, snapshot):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
@@ -1,27 +1,220 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from config.settings import Config
+from tools.etag_store import ETagStore
+from tools.rate_limit import get_rate_limit_scheduler
+from transport.http_pool import get_async_http_pool, get_http_pool
+
+
 class MCPGitHub:
-    def __init__(self, github_token):
+    METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+    # One retry after waiting out a rate-limit rejection
+    RATE_LIMIT_RETRIES = 1
+    # GitHub caps list endpoints at 100 items per page
+    MAX_PER_PAGE = 100
+
+    def __init__(self, github_token, http_pool=None, etag_store=None, rate_limiter=None):
         self.github_token = github_token
         self.base_url = "https://api.github.com"
+        # Reuse pooled keep-alive connections instead of a new handshake per tool call
+        self.http = http_pool or self._default_http_pool()
+        # Conditional GETs: a 304 is served from the stored body and costs no rate limit
+        if etag_store is None and Config.GITHUB_ETAG_CACHE:
+            etag_store = ETagStore(path=Config.GITHUB_ETAG_CACHE_PATH)
+        self.etag_store = etag_store
+        # Shared across clients so core/search quotas are tracked per process
+        self.rate_limiter = rate_limiter or get_rate_limit_scheduler()
 
-    def call_tool(self, endpoint, method='GET', data=None):
-        headers = {
+    def _default_http_pool(self):
+        return get_http_pool()
+
+    def _headers(self):
+        return {
             'Authorization': f'token {self.github_token}',
             'Accept': 'application/vnd.github.v3+json'
         }
-        url = f"{self.base_url}/{endpoint}"
 
-        if method == 'GET':
-            response = requests.get(url, headers=headers)
-        elif method == 'POST':
-            response = requests.post(url, headers=headers, json=data)
-        elif method == 'PUT':
-            response = requests.put(url, headers=headers, json=data)
-        elif method == 'DELETE':
-            response = requests.delete(url, headers=headers)
-        else:
+    def _request_args(self, endpoint, method, data):
+        if method not in self.METHODS:
             raise ValueError("Invalid HTTP method")
+        url = f"{self.base_url}/{endpoint}"
+        kwargs = {'headers': self._headers()}
+        if method in ('POST', 'PUT'):
+            kwargs['json'] = data
+        return url, kwargs
+
+    def _etag_key(self, url, method, headers):
+        # Returns the store key for GETs (adding If-None-Match when an ETag is known)
+        if self.etag_store is None:
+            return None
+        key = self.etag_store.make_key(url, self.github_token)
+        if method != 'GET':
+            # A write may change the resource, so never replay its old body
+            self.etag_store.invalidate(key)
+            return None
+        etag, _ = self.etag_store.get(key)
+        if etag:
+            headers['If-None-Match'] = etag
+        return key
+
+    def _stored_body(self, etag_key):
+        # Body to serve for a 304, or None when the entry was evicted or invalidated after the
+        # request went out; the ETag is then dropped and the caller asks again unconditionally
+        _, body = self.etag_store.get(etag_key)
+        if body is None:
+            self.etag_store.invalidate(etag_key)
+        return body
+
+    def _handle_response(self, etag_key, status, headers, text):
+        # For a 304, ``text`` is the stored body
+        if etag_key is not None:
+            if status == 304:
+                self.etag_store.record(not_modified=True, body=text)
+                return json.loads(text)
+            self.etag_store.record(not_modified=False)
+            if status in range(200, 300) and headers.get('ETag'):
+                self.etag_store.put(etag_key, headers['ETag'], text)
+
+        if status not in range(200, 300):
+            raise Exception(f"GitHub API error: {status} - {text}")
+
+        return json.loads(text)
+
+    def etag_stats(self):
+        return self.etag_store.stats() if self.etag_store else {}
+
+    def _page_url(self, endpoint, per_page):
+        scheme, netloc, path, query, fragment = urlsplit(f"{self.base_url}/{endpoint}")
+        params = parse_qs(query)
+        params.setdefault('per_page', [str(min(per_page, self.MAX_PER_PAGE))])
+        return urlunsplit((scheme, netloc, path, urlencode(params, doseq=True), fragment))
+
+    @staticmethod
+    def _next_url(links):
+        # requests and aiohttp both parse the Link header into {rel: {'url': ...}}
+        next_link = links.get('next')
+        return str(next_link['url']) if next_link else None
+
+    @staticmethod
+    def _page_items(data):
+        # Search endpoints wrap results as {"total_count": ..., "items": [...]}
+        return data['items'] if isinstance(data, dict) and 'items' in data else data
+
+    def _exchange(self, method, url, kwargs):
+        bucket = self.rate_limiter.bucket_for(url)
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire(bucket)
+            response = self.http.request(method, url, **kwargs)
+            limited = self.rate_limiter.update(bucket, response.headers, response.status_code)
+            if not limited:
+                break
+        return response.status_code, response.headers, response.text, response.links
+
+    def _send(self, method, url, kwargs, conditional=True):
+        etag_key = self._etag_key(url, method, kwargs['headers']) if conditional else None
+        status, headers, text, links = self._exchange(method, url, kwargs)
+        if status == 304 and etag_key is not None:
+            text = self._stored_body(etag_key)
+            if text is None:
+                kwargs['headers'].pop('If-None-Match', None)
+                status, headers, text, links = self._exchange(method, url, kwargs)
+        return self._handle_response(etag_key, status, headers, text), links
+
+    def call_tool(self, endpoint, method='GET', data=None):
+        url, kwargs = self._request_args(endpoint, method, data)
+        result, _ = self._send(method, url, kwargs)
+        return result
+
+    def _fetch_page(self, url):
+        # Pages skip the ETag store: a 304 carries no Link header to follow
+        data, links = self._send('GET', url, {'headers': self._headers()}, conditional=False)
+        return self._page_items(data), self._next_url(links)
+
+    def iter_pages(self, endpoint, per_page=MAX_PER_PAGE, prefetch=False):
+        """Yield each page of a list endpoint, following ``Link: rel=next``.
+
+        Only the current page (plus the next one when ``prefetch`` is set) is held in
+        memory. With ``prefetch`` the next page is requested in the background while
+        the caller handles the current one.
+        """
+        url = self._page_url(endpoint, per_page)
+        if not prefetch:
+            while url:
+                items, url = self._fetch_page(url)
+                yield items
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(self._fetch_page, url)
+            while pending is not None:
+                items, next_url = pending.result()
+                pending = executor.submit(self._fetch_page, next_url) if next_url else None
+                yield items
+
+    def iter_items(self, endpoint, per_page=MAX_PER_PAGE, prefetch=False):
+        for page in self.iter_pages(endpoint, per_page=per_page, prefetch=prefetch):
+            yield from page
+
+
+class AsyncMCPGitHub(MCPGitHub):
+    """Same API as ``MCPGitHub`` with an awaitable ``call_tool``, backed by the shared aiohttp pool."""
+
+    def _default_http_pool(self):
+        return get_async_http_pool()
+
+    async def _exchange(self, method, url, kwargs):
+        bucket = self.rate_limiter.bucket_for(url)
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            await self.rate_limiter.acquire_async(bucket)
+            async with self.http.request(method, url, **kwargs) as response:
+                status, headers, links = response.status, response.headers, response.links
+                text = await response.text()
+            if not self.rate_limiter.update(bucket, headers, status):
+                break
+        return status, headers, text, links
+
+    async def _send(self, method, url, kwargs, conditional=True):
+        etag_key = self._etag_key(url, method, kwargs['headers']) if conditional else None
+        status, headers, text, links = await self._exchange(method, url, kwargs)
+        if status == 304 and etag_key is not None:
+            text = self._stored_body(etag_key)
+            if text is None:
+                kwargs['headers'].pop('If-None-Match', None)
+                status, headers, text, links = await self._exchange(method, url, kwargs)
+        return self._handle_response(etag_key, status, headers, text), links
+
+    async def call_tool(self, endpoint, method='GET', data=None):
+        url, kwargs = self._request_args(endpoint, method, data)
+        result, _ = await self._send(method, url, kwargs)
+        return result
+
+    async def _fetch_page(self, url):
+        data, links = await self._send('GET', url, {'headers': self._headers()}, conditional=False)
+        return self._page_items(data), self._next_url(links)
+
+    async def iter_pages(self, endpoint, per_page=MCPGitHub.MAX_PER_PAGE, prefetch=False):
+        url = self._page_url(endpoint, per_page)
+        if not prefetch:
+            while url:
+                items, url = await self._fetch_page(url)
+                yield items
+            return
 
-        if response.status_code not in range(200, 300):
-            raise Exception(f"GitHub API error: {response.status_code} - {response.text}")
+        pending = asyncio.ensure_future(self._fetch_page(url))
+        try:
+            while pending is not None:
+                items, next_url = await pending
+                pending = asyncio.ensure_future(self._fetch_page(next_url)) if next_url else None
+                yield items
+        finally:
+            if pending is not None:
+                pending.cancel()
 
-        return response.json()
\ No newline at end of file
+    async def iter_items(self, endpoint, per_page=MCPGitHub.MAX_PER_PAGE, prefetch=False):
+        async for page in self.iter_pages(endpoint, per_page=per_page, prefetch=prefetch):
+            for item in page:
+                yield item
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import threading
+import time
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of waiting when a bucket resets later than the scheduler's ``max_wait``."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"GitHub '{name}' rate limit exhausted; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class RateLimitBucket:
+    def __init__(self, name):
+        self.name = name
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+
+
+class RateLimitScheduler:
+    """Token-bucket view of GitHub's ``core`` and ``search`` rate limits.
+
+    Buckets are refreshed from the ``X-RateLimit-*`` headers of every response and a
+    token is taken before each request. When a bucket is empty, callers wait for its
+    reset instead of being rejected with a 403, as long as the reset is at most
+    ``max_wait`` seconds away; a longer wait raises ``RateLimitExceeded`` so the caller
+    can decide. One scheduler is meant to be shared by every GitHub client in the
+    process.
+    """
+
+    def __init__(self, reserve=0, max_wait=60.0, resync_interval=60.0):
+        # Tokens held back for interactive calls made outside the scheduler
+        self.reserve = reserve
+        # None waits for the reset however far away it is
+        self.max_wait = max_wait
+        # Seconds between refreshes from GET /rate_limit (see resync_from_github)
+        self.resync_interval = resync_interval
+        self.last_sync = 0.0
+        self.buckets = {name: RateLimitBucket(name) for name in ('core', 'search')}
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.rejections = 0
+
+    @classmethod
+    def from_env(cls):
+        max_wait = float(os.getenv('GITHUB_RATE_LIMIT_MAX_WAIT', '60'))
+        return cls(
+            reserve=int(os.getenv('GITHUB_RATE_LIMIT_RESERVE', '0')),
+            max_wait=max_wait if max_wait >= 0 else None,
+            resync_interval=float(os.getenv('GITHUB_RATE_LIMIT_RESYNC', '60')),
+        )
+
+    @staticmethod
+    def bucket_for(url):
+        return 'search' if '/search/' in url else 'core'
+
+    def _bucket(self, name):
+        if name not in self.buckets:
+            self.buckets[name] = RateLimitBucket(name)
+        return self.buckets[name]
+
+    def _reserve(self, name, tokens):
+        # Must hold the lock. Returns 0 when the tokens were taken, else seconds to wait.
+        bucket = self._bucket(name)
+        now = time.time()
+        if bucket.blocked_until > now:
+            return bucket.blocked_until - now
+        if bucket.remaining is None:
+            return 0
+        if bucket.reset_at is not None and now >= bucket.reset_at:
+            bucket.remaining = bucket.limit
+            bucket.reset_at = None
+        if bucket.remaining - tokens >= self.reserve:
+            bucket.remaining -= tokens
+            return 0
+        return max(bucket.reset_at - now, 0.05) if bucket.reset_at else 1.0
+
+    def _enter(self):
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def _leave(self, waited, delayed):
+        with self._lock:
+            self.queue_depth -= 1
+            if delayed:
+                self.waits += 1
+                self.total_wait += waited
+
+    def _next_delay(self, name, tokens, start):
+        with self._lock:
+            delay = self._reserve(name, tokens)
+            if delay > 0 and self.max_wait is not None and \
+                    time.monotonic() - start + delay > self.max_wait:
+                self.rejections += 1
+                raise RateLimitExceeded(name, delay)
+        return delay
+
+    def acquire(self, name='core', tokens=1):
+        start = time.monotonic()
+        delayed = False
+        self._enter()
+        try:
+            while True:
+                delay = self._next_delay(name, tokens, start)
+                if delay <= 0:
+                    break
+                delayed = True
+                time.sleep(delay)
+        finally:
+            waited = time.monotonic() - start
+            self._leave(waited, delayed)
+        return waited
+
+    async def acquire_async(self, name='core', tokens=1):
+        start = time.monotonic()
+        delayed = False
+        self._enter()
+        try:
+            while True:
+                delay = self._next_delay(name, tokens, start)
+                if delay <= 0:
+                    break
+                delayed = True
+                await asyncio.sleep(delay)
+        finally:
+            waited = time.monotonic() - start
+            self._leave(waited, delayed)
+        return waited
+
+    def update(self, name, headers, status=200):
+        # Returns True when the response was a rate-limit rejection worth retrying
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        with self._lock:
+            bucket = self._bucket(headers.get('x-ratelimit-resource') or name)
+            if headers.get('x-ratelimit-limit') is not None:
+                bucket.limit = int(headers['x-ratelimit-limit'])
+                bucket.remaining = int(headers['x-ratelimit-remaining'])
+                bucket.reset_at = float(headers['x-ratelimit-reset'])
+
+            if status not in (403, 429):
+                return False
+            retry_after = headers.get('retry-after')
+            if retry_after is not None:
+                # Secondary (abuse) rate limit
+                bucket.blocked_until = time.time() + float(retry_after)
+                return True
+            return bucket.remaining == 0
+
+    def needs_resync(self):
+        return time.time() - self.last_sync >= self.resync_interval
+
+    def resync_from_github(self, github):
+        # Refresh both buckets from a PyGithub client's GET /rate_limit, which is free.
+        # Failed attempts count too, so an unreachable endpoint is not retried on every call.
+        self.last_sync = time.time()
+        overview = github.get_rate_limit()
+        resources = getattr(overview, 'resources', overview)
+        with self._lock:
+            for name in ('core', 'search'):
+                rate = getattr(resources, name)
+                bucket = self._bucket(name)
+                bucket.limit = rate.limit
+                bucket.remaining = rate.remaining
+                bucket.reset_at = rate.reset.timestamp()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'waits': self.waits,
+                'total_wait_seconds': round(self.total_wait, 3),
+                'rejections': self.rejections,
+                'buckets': {
+                    name: {
+                        'limit': bucket.limit,
+                        'remaining': bucket.remaining,
+                        'reset_at': bucket.reset_at,
+                    }
+                    for name, bucket in self.buckets.items()
+                },
+            }
+
+
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_rate_limit_scheduler():
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        with _shared_scheduler_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = RateLimitScheduler.from_env()
+    return _shared_scheduler
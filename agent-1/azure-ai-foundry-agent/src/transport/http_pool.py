@@ -0,0 +1,212 @@
+import asyncio
+import threading
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import Config
+
+
+class HTTPPool:
+    """Shared keep-alive HTTP session used by the Azure Search and GitHub clients.
+
+    Reusing one ``requests.Session`` lets every retrieval or tool call ride an
+    already-open TCP+TLS connection instead of paying a new handshake each time.
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, keep_alive=None,
+                 connect_timeout=None, read_timeout=None, max_retries=None):
+        self.pool_connections = Config.HTTP_POOL_CONNECTIONS if pool_connections is None else pool_connections
+        self.pool_maxsize = Config.HTTP_POOL_MAXSIZE if pool_maxsize is None else pool_maxsize
+        self.keep_alive = Config.HTTP_KEEP_ALIVE if keep_alive is None else keep_alive
+        self.timeout = (
+            Config.HTTP_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+            Config.HTTP_READ_TIMEOUT if read_timeout is None else read_timeout,
+        )
+        self.max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.session = self._build_session()
+
+    def _build_session(self):
+        session = requests.Session()
+        # Only retry idempotent requests on connection errors and transient gateway responses
+        # allowed_methods needs urllib3>=1.26 (pinned in requirements.txt)
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_http_pool():
+    """Return the process-wide pool, creating it from ``Config`` on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = HTTPPool()
+    return _shared_pool
+
+
+def close_http_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
+
+
+class AsyncHTTPPool:
+    """aiohttp counterpart of ``HTTPPool`` for the async clients.
+
+    A ``ClientSession`` is bound to an event loop, so the pool keeps one session per loop,
+    created lazily inside it. Loops in other threads keep their own sessions; sessions
+    whose loop has closed are detached and their connectors closed on the next lookup.
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, keep_alive=None,
+                 connect_timeout=None, read_timeout=None):
+        # Imported here so the sync-only code paths do not need aiohttp installed
+        import aiohttp
+
+        self.pool_connections = Config.HTTP_POOL_CONNECTIONS if pool_connections is None else pool_connections
+        self.pool_maxsize = Config.HTTP_POOL_MAXSIZE if pool_maxsize is None else pool_maxsize
+        self.keep_alive = Config.HTTP_KEEP_ALIVE if keep_alive is None else keep_alive
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=Config.HTTP_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+            sock_read=Config.HTTP_READ_TIMEOUT if read_timeout is None else read_timeout,
+        )
+        # Keyed weakly, so a loop that is garbage collected drops its entry
+        self._sessions = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._closing = set()
+
+    def _discard_closed(self):
+        # Sessions of closed loops cannot be awaited any more, so their connectors are closed here
+        with self._lock:
+            stale = [(loop, session) for loop, session in self._sessions.items() if loop.is_closed()]
+            for loop, _ in stale:
+                del self._sessions[loop]
+        for _, session in stale:
+            if session.closed:
+                continue
+            connector = session.connector
+            # Detaching marks the session closed, so aiohttp does not warn about it on garbage collection
+            session.detach()
+            if connector is not None:
+                task = asyncio.get_running_loop().create_task(self._close_connector(connector))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_connector(connector):
+        try:
+            await connector.close()
+        except RuntimeError:
+            # The old loop is closed and its transports are already gone
+            pass
+
+    def get_session(self):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            self._discard_closed()
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_connections * self.pool_maxsize,
+                limit_per_host=self.pool_maxsize,
+                force_close=not self.keep_alive,
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            with self._lock:
+                self._sessions[loop] = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        # Returns aiohttp's request context manager: ``async with pool.get(url) as response``
+        return self.get_session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    async def close(self):
+        """Close the current loop's session; sessions of loops still running elsewhere are closed on them."""
+        current = asyncio.get_running_loop()
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.items()), weakref.WeakKeyDictionary()
+        for loop, session in sessions:
+            if session.closed:
+                continue
+            if loop is current:
+                await session.close()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            else:
+                connector = session.connector
+                session.detach()
+                if connector is not None:
+                    await self._close_connector(connector)
+
+
+_shared_async_pool = None
+
+
+def get_async_http_pool():
+    """Return the process-wide async pool, creating it from ``Config`` on first use."""
+    global _shared_async_pool
+    if _shared_async_pool is None:
+        _shared_async_pool = AsyncHTTPPool()
+    return _shared_async_pool
+
+
+async def close_async_http_pool():
+    global _shared_async_pool
+    if _shared_async_pool is not None:
+        await _shared_async_pool.close()
+        _shared_async_pool = None
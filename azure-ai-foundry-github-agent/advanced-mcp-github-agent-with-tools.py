@@ -6,21 +6,84 @@ This version integrates PyGithub library as custom functions for the agent.
 
 import os
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from azure.ai.projects import AIProjectClient
 from azure.identity import DefaultAzureCredential
-from typing import Optional
-from github import Github, Auth
+from typing import List, Optional
+from github import Github, Auth, GithubException
 import json
+from run_waiter import RunWaiter
+from github_cache import ToolCache, cached_tool
+from rate_limit import RateLimitScheduler
+
+DEFAULT_TRENDING_LANGUAGES = ['Python', 'JavaScript', 'TypeScript', 'Java', 'Go', 'Rust', 'C++']
 
 class GitHubTools:
     """GitHub tools wrapper for the AI agent."""
     
-    def __init__(self, github_token: str):
-        """Initialize GitHub client."""
+    def __init__(
+        self,
+        github_token: str,
+        cache: Optional[ToolCache] = None,
+        rate_limiter: Optional[RateLimitScheduler] = None
+    ):
+        """
+        Initialize GitHub client.
+        
+        Args:
+            github_token: GitHub personal access token
+            cache: Optional response cache for the read-only tools
+            rate_limiter: Optional scheduler that delays calls before GitHub rejects them
+        """
         auth = Auth.Token(github_token)
         self.github = Github(auth=auth)
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        
+        # GitHub search allows 30 requests/minute and penalizes bursts of concurrent calls
+        self.search_concurrency = max(1, int(os.getenv('GITHUB_SEARCH_CONCURRENCY', '4')))
+        self.trending_languages = [
+            lang.strip()
+            for lang in os.getenv('TRENDING_LANGUAGES', ','.join(DEFAULT_TRENDING_LANGUAGES)).split(',')
+            if lang.strip()
+        ]
     
+    def _github_call(self, bucket: str, call, tokens: int = 1):
+        """
+        Run a GitHub call through the rate-limit scheduler.
+        
+        Args:
+            bucket: Rate-limit resource the call is charged to ('core' or 'search')
+            call: Zero-argument callable performing the request(s)
+            tokens: Number of requests the call makes
+            
+        Returns:
+            Whatever the call returns
+        """
+        if self.rate_limiter is None:
+            return call()
+        
+        if self.rate_limiter.needs_resync():
+            try:
+                self.rate_limiter.resync_from_github(self.github)
+            except GithubException:
+                pass
+        
+        # Wait out a rate-limit rejection once, then give up
+        for attempt in range(2):
+            self.rate_limiter.acquire(bucket, tokens)
+            try:
+                result = call()
+            except GithubException as e:
+                if attempt or not self.rate_limiter.update(bucket, e.headers, e.status):
+                    raise
+            else:
+                # Keep the bucket in step with the X-RateLimit-* headers of the response
+                self.rate_limiter.update_from_github(bucket, self.github)
+                return result
+    
+    @cached_tool("search_repositories")
     def search_repositories(self, query: str, max_results: int = 5) -> str:
         """
         Search for GitHub repositories.
@@ -36,7 +99,10 @@ class GitHubTools:
             repos = self.github.search_repositories(query=query, sort='stars', order='desc')
             results = []
             
-            for i, repo in enumerate(repos[:max_results], 1):
+            # Search items already include topics and total_count, so one request
+            # covers the whole listing (no per-repo get_topics() round-trips)
+            first_page = self._github_call("search", lambda: repos.get_page(0))
+            for i, repo in enumerate(first_page[:max_results], 1):
                 results.append({
                     "rank": i,
                     "name": repo.full_name,
@@ -45,13 +111,14 @@ class GitHubTools:
                     "forks": repo.forks_count,
                     "language": repo.language or "Not specified",
                     "url": repo.html_url,
-                    "topics": repo.get_topics()[:5] if hasattr(repo, 'get_topics') else []
+                    "topics": (repo.topics or [])[:5]
                 })
             
             return json.dumps({"repositories": results, "total_found": repos.totalCount}, indent=2)
         except Exception as e:
             return json.dumps({"error": str(e)})
     
+    @cached_tool("get_repository_info")
     def get_repository_info(self, repo_full_name: str) -> str:
         """
         Get detailed information about a specific repository.
@@ -63,7 +130,7 @@ class GitHubTools:
             JSON string with detailed repository information
         """
         try:
-            repo = self.github.get_repo(repo_full_name)
+            repo = self._github_call("core", lambda: self.github.get_repo(repo_full_name))
             
             info = {
                 "name": repo.full_name,
@@ -76,7 +143,7 @@ class GitHubTools:
                 "license": repo.license.name if repo.license else "No license",
                 "created_at": repo.created_at.isoformat(),
                 "updated_at": repo.updated_at.isoformat(),
-                "topics": repo.get_topics()[:10],
+                "topics": (repo.topics or [])[:10],
                 "url": repo.html_url,
                 "default_branch": repo.default_branch,
                 "size_kb": repo.size,
@@ -88,35 +155,50 @@ class GitHubTools:
         except Exception as e:
             return json.dumps({"error": str(e)})
     
-    def get_trending_languages(self) -> str:
+    @cached_tool("get_trending_languages")
+    def get_trending_languages(self, languages: Optional[List[str]] = None) -> str:
         """
         Get information about trending programming languages on GitHub.
         
+        Args:
+            languages: Languages to compare (default: TRENDING_LANGUAGES env var or a built-in list)
+        
         Returns:
             JSON string with popular languages
         """
         try:
             # Search for highly starred repos in different languages
-            languages = ['Python', 'JavaScript', 'TypeScript', 'Java', 'Go', 'Rust', 'C++']
-            results = []
+            languages = languages or self.trending_languages
             
-            for lang in languages:
-                query = f"language:{lang} stars:>1000"
-                repos = self.github.search_repositories(query=query, sort='stars', order='desc')
-                
-                if repos.totalCount > 0:
-                    top_repo = repos[0]
-                    results.append({
-                        "language": lang,
-                        "total_repos": repos.totalCount,
-                        "top_repo": top_repo.full_name,
-                        "top_repo_stars": top_repo.stargazers_count
-                    })
+            # One search per language, fanned out under the search concurrency cap
+            with ThreadPoolExecutor(max_workers=min(self.search_concurrency, len(languages))) as executor:
+                summaries = list(executor.map(self._top_repo_for_language, languages))
             
+            results = [summary for summary in summaries if summary]
             return json.dumps({"trending_languages": results}, indent=2)
         except Exception as e:
             return json.dumps({"error": str(e)})
     
+    def _top_repo_for_language(self, lang: str) -> Optional[dict]:
+        """Summarize the most starred repository for a language with a single search request."""
+        query = f"language:{lang} stars:>1000"
+        repos = self.github.search_repositories(query=query, sort='stars', order='desc')
+        
+        # The first page carries both total_count and the top item, so totalCount
+        # and the top repository do not trigger extra requests
+        first_page = self._github_call("search", lambda: repos.get_page(0))
+        if not first_page:
+            return None
+        
+        top_repo = first_page[0]
+        return {
+            "language": lang,
+            "total_repos": repos.totalCount,
+            "top_repo": top_repo.full_name,
+            "top_repo_stars": top_repo.stargazers_count
+        }
+    
+    @cached_tool("get_my_repositories")
     def get_my_repositories(self, max_results: int = 10) -> str:
         """
         Get the authenticated user's repositories.
@@ -132,7 +214,14 @@ class GitHubTools:
             repos = user.get_repos(sort='updated', direction='desc')
             results = []
             
-            for i, repo in enumerate(repos[:max_results], 1):
+            # GET /user for the profile fields, then the listing pages
+            username, total_repos = self._github_call("core", lambda: (user.login, user.public_repos))
+            pages = -(-max_results // self.github.per_page)
+            listing = self._github_call("core", lambda: list(repos[:max_results]), tokens=pages)
+            
+            # Listed repositories already include topics; read them from the listing
+            # instead of one get_topics() request per repository
+            for i, repo in enumerate(listing, 1):
                 results.append({
                     "rank": i,
                     "name": repo.full_name,
@@ -143,12 +232,12 @@ class GitHubTools:
                     "url": repo.html_url,
                     "private": repo.private,
                     "updated_at": repo.updated_at.isoformat(),
-                    "topics": repo.get_topics()[:5] if hasattr(repo, 'get_topics') else []
+                    "topics": (repo.topics or [])[:5]
                 })
             
             return json.dumps({
-                "username": user.login,
-                "total_repos": user.public_repos,
+                "username": username,
+                "total_repos": total_repos,
                 "repositories": results
             }, indent=2)
         except Exception as e:
@@ -163,11 +252,14 @@ class GitHubMCPAgent:
         self.endpoint = os.getenv('AZURE_AI_PROJECT_ENDPOINT')
         self.github_token = os.getenv('GITHUB_PERSONAL_ACCESS_TOKEN')
         self.model_name = os.getenv('MODEL_NAME', 'gpt-4o')
+        self.tool_concurrency = max(1, int(os.getenv('TOOL_CALL_CONCURRENCY', '4')))
         
         self.project_client: Optional[AIProjectClient] = None
         self.agent = None
         self.thread = None
         self.github_tools = None
+        self.tool_executor: Optional[ThreadPoolExecutor] = None
+        self.run_waiter: Optional[RunWaiter] = None
         
     async def initialize(self):
         """Initialize Azure AI client and create agent with GitHub tools."""
@@ -187,12 +279,21 @@ class GitHubMCPAgent:
             credential=DefaultAzureCredential()
         )
         
+        self.run_waiter = RunWaiter.for_agents_client(self.project_client.agents)
         print("✅ Azure AI Project Client initialized")
         
         # Initialize GitHub tools
         print("🔧 Setting up GitHub tools...")
-        self.github_tools = GitHubTools(self.github_token)
-        print("✅ GitHub tools configured")
+        self.github_tools = GitHubTools(
+            self.github_token,
+            cache=ToolCache.from_env(),
+            rate_limiter=RateLimitScheduler.from_env()
+        )
+        self.tool_executor = ThreadPoolExecutor(
+            max_workers=self.tool_concurrency,
+            thread_name_prefix="github-tool"
+        )
+        print(f"✅ GitHub tools configured (up to {self.tool_concurrency} concurrent tool calls)")
         
         # Create agent with GitHub tools
         print(f"🤖 Creating agent with model: {self.model_name}")
@@ -245,7 +346,13 @@ class GitHubMCPAgent:
                     "description": "Get information about trending programming languages on GitHub based on repository counts and popularity.",
                     "parameters": {
                         "type": "object",
-                        "properties": {}
+                        "properties": {
+                            "languages": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Optional languages to compare. Example: ['Python', 'Rust']. Defaults to a common set of languages."
+                            }
+                        }
                     }
                 }
             },
@@ -311,13 +418,44 @@ Format repository names as owner/repo and include links when mentioning them."""
         elif function_name == "get_repository_info":
             result = self.github_tools.get_repository_info(**arguments)
         elif function_name == "get_trending_languages":
-            result = self.github_tools.get_trending_languages()
+            result = self.github_tools.get_trending_languages(**arguments)
         elif function_name == "get_my_repositories":
             result = self.github_tools.get_my_repositories(**arguments)
         else:
             result = json.dumps({"error": f"Unknown function: {function_name}"})
         
         return result
+    
+    def _safe_tool_call(self, tool_call) -> str:
+        """Run a single tool call, turning any failure into an error payload for that call only."""
+        try:
+            return self.handle_tool_call(tool_call)
+        except Exception as e:
+            return json.dumps({"error": f"{tool_call.function.name} failed: {str(e)}"})
+    
+    async def run_tool_calls(self, tool_calls) -> list:
+        """
+        Execute the tool calls of one run step concurrently.
+        
+        Calls are dispatched to a thread pool bounded by TOOL_CALL_CONCURRENCY, so a
+        multi-tool turn costs roughly one GitHub round-trip instead of one per call.
+        
+        Args:
+            tool_calls: Tool calls from run.required_action.submit_tool_outputs
+            
+        Returns:
+            Tool outputs in the same order as tool_calls
+        """
+        loop = asyncio.get_running_loop()
+        outputs = await asyncio.gather(*[
+            loop.run_in_executor(self.tool_executor, self._safe_tool_call, tool_call)
+            for tool_call in tool_calls
+        ])
+        
+        return [
+            {"tool_call_id": tool_call.id, "output": output}
+            for tool_call, output in zip(tool_calls, outputs)
+        ]
         
     async def chat(self, user_message: str) -> str:
         """Send a message and get response."""
@@ -334,41 +472,31 @@ Format repository names as owner/repo and include links when mentioning them."""
             content=user_message
         )
         
-        # Run the agent
-        run = self.project_client.agents.runs.create(
-            thread_id=self.thread.id,
-            agent_id=self.agent.id
-        )
-        
-        # Wait for completion and handle tool calls
+        # Run the agent and wait for it to settle
         print("⏳ Processing...")
-        while run.status in ["queued", "in_progress", "requires_action"]:
-            await asyncio.sleep(1)
-            run = self.project_client.agents.runs.get(
+        if self.run_waiter.can_stream:
+            run = await self.run_waiter.stream(self.thread.id, self.agent.id)
+        else:
+            run = self.project_client.agents.runs.create(
                 thread_id=self.thread.id,
-                run_id=run.id
+                agent_id=self.agent.id
             )
+            run = await self.run_waiter.wait(self.thread.id, run)
+        
+        # Handle required actions (tool calls) until the run finishes
+        while run.status == "requires_action":
+            print("🔧 Agent is using GitHub tools...")
             
-            # Handle required actions (tool calls)
-            if run.status == "requires_action":
-                print("🔧 Agent is using GitHub tools...")
-                
-                tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                tool_outputs = []
-                
-                for tool_call in tool_calls:
-                    output = self.handle_tool_call(tool_call)
-                    tool_outputs.append({
-                        "tool_call_id": tool_call.id,
-                        "output": output
-                    })
-                
-                # Submit tool outputs
-                run = self.project_client.agents.runs.submit_tool_outputs(
-                    thread_id=self.thread.id,
-                    run_id=run.id,
-                    tool_outputs=tool_outputs
-                )
+            tool_calls = run.required_action.submit_tool_outputs.tool_calls
+            tool_outputs = await self.run_tool_calls(tool_calls)
+            
+            # Submit tool outputs
+            run = self.project_client.agents.runs.submit_tool_outputs(
+                thread_id=self.thread.id,
+                run_id=run.id,
+                tool_outputs=tool_outputs
+            )
+            run = await self.run_waiter.wait(self.thread.id, run)
         
         # Get response
         if run.status == "completed":
@@ -396,6 +524,19 @@ Format repository names as owner/repo and include links when mentioning them."""
             print("\n🧹 Cleaning up...")
             self.project_client.agents.delete_agent(self.agent.id)
             print("✅ Agent deleted")
+        
+        if self.github_tools and self.github_tools.cache:
+            stats = self.github_tools.cache.stats()
+            print(f"📊 GitHub cache: {stats['hits']} hits / {stats['misses']} misses (hit rate {stats['hit_rate']:.0%})")
+        
+        if self.github_tools and self.github_tools.rate_limiter:
+            metrics = self.github_tools.rate_limiter.metrics()
+            print(f"📈 GitHub rate limiter: {metrics['waits']} delayed calls, "
+                  f"{metrics['total_wait_seconds']}s waited, max queue depth {metrics['max_queue_depth']}")
+        
+        if self.tool_executor:
+            self.tool_executor.shutdown(wait=False)
+            self.tool_executor = None
 
 async def run_demo():
     """Run a demo conversation."""
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 from azure.ai.projects import AIProjectClient
 from azure.identity import DefaultAzureCredential
 from typing import Optional
+from run_waiter import RunWaiter
 
 class GitHubMCPAgent:
     """AI Agent with GitHub MCP integration."""
@@ -24,6 +25,7 @@ class GitHubMCPAgent:
         self.project_client: Optional[AIProjectClient] = None
         self.agent = None
         self.thread = None
+        self.run_waiter: Optional[RunWaiter] = None
         
     async def initialize(self):
         """Initialize Azure AI client and create agent."""
@@ -43,6 +45,7 @@ class GitHubMCPAgent:
             credential=DefaultAzureCredential()
         )
         
+        self.run_waiter = RunWaiter.for_agents_client(self.project_client.agents)
         print("✅ Azure AI Project Client initialized")
         
         # Create agent with GitHub capabilities
@@ -93,24 +96,20 @@ Format code snippets nicely and explain technical concepts clearly.""",
             content=user_message
         )
         
-        # Run the agent
-        run = self.project_client.agents.runs.create(
-            thread_id=self.thread.id,
-            assistant_id=self.agent.id
-        )
-        
-        # Wait for completion
+        # Run the agent and wait for completion
         print("⏳ Processing...")
-        while run.status in ["queued", "in_progress", "requires_action"]:
-            await asyncio.sleep(1)
-            run = self.project_client.agents.runs.get(
+        if self.run_waiter.can_stream:
+            run = await self.run_waiter.stream(self.thread.id, self.agent.id)
+        else:
+            run = self.project_client.agents.runs.create(
                 thread_id=self.thread.id,
-                run_id=run.id
+                assistant_id=self.agent.id
             )
-            
-            # Handle tool calls if needed
-            if run.status == "requires_action":
-                print("🔧 Agent is using tools...")
+            run = await self.run_waiter.wait(self.thread.id, run)
+        
+        # This agent has no function tools to answer with
+        if run.status == "requires_action":
+            print("🔧 Agent requested tools, but none are configured")
         
         # Get response
         if run.status == "completed":
@@ -0,0 +1,182 @@
+"""
+GitHub Tool Request Count Benchmark
+Counts the HTTP requests each GitHubTools call makes against a local stub of the GitHub API.
+
+The stub serves responses from benchmarks/fixtures/github_api.json, so no token or network
+access is needed. A per-repository get_topics() listing (the previous data path) is measured
+next to the current tools for comparison. Each result is checked against the fixture (names,
+stars, topics), so a tool that fails after fewer requests is reported instead of counted as a win.
+
+Usage:
+    python benchmarks/bench_tool_requests.py
+"""
+
+import os
+import sys
+import json
+import threading
+import importlib.util
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from github import Github, Auth
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_PATH = os.path.join(BENCH_DIR, "fixtures", "github_api.json")
+
+
+class GitHubStubHandler(BaseHTTPRequestHandler):
+    """Serves fixture responses and counts every request it receives."""
+
+    protocol_version = "HTTP/1.1"
+    fixture = {}
+    base_url = ""
+    requests = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        with GitHubStubHandler.lock:
+            GitHubStubHandler.requests[path] += 1
+
+        if path.endswith("/topics"):
+            repo = self._find_repo(path[len("/repos/"):-len("/topics")])
+            payload = {"names": repo["topics"]} if repo else None
+        else:
+            payload = self.fixture.get(path)
+
+        if payload is None:
+            self._send(404, {"message": "Not Found"})
+        else:
+            self._send(200, payload)
+
+    def _find_repo(self, full_name):
+        for repos in (self.fixture["/search/repositories"]["items"], self.fixture["/user/repos"]):
+            for repo in repos:
+                if repo["full_name"] == full_name:
+                    return repo
+        return None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).replace("{base_url}", self.base_url).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def load_github_tools():
+    """Import GitHubTools from the hyphenated agent script."""
+    sys.path.insert(0, PROJECT_DIR)
+    spec = importlib.util.spec_from_file_location(
+        "agent_with_tools",
+        os.path.join(PROJECT_DIR, "advanced-mcp-github-agent-with-tools.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.GitHubTools
+
+
+def per_repo_topics_listing(github, query, max_results):
+    """Previous data path: one get_topics() request per listed repository."""
+    repos = github.search_repositories(query=query, sort='stars', order='desc')
+    topics = [repo.get_topics()[:5] for repo in repos[:max_results]]
+    return topics, repos.totalCount
+
+
+def count_requests(call):
+    """Run a call and return its result and how many requests reached the stub."""
+    with GitHubStubHandler.lock:
+        GitHubStubHandler.requests.clear()
+    result = call()
+    with GitHubStubHandler.lock:
+        return result, sum(GitHubStubHandler.requests.values())
+
+
+def expected_listing(repos, max_results):
+    """Name, stars and first five topics of the first max_results fixture repositories."""
+    return [(repo["full_name"], repo["stargazers_count"], repo["topics"][:5]) for repo in repos[:max_results]]
+
+
+def check_listing(result, expected):
+    """Assert a tool's JSON repository listing matches the fixture, rank by rank."""
+    assert "error" not in result, result["error"]
+    listing = [(repo["name"], repo["stars"], repo["topics"]) for repo in result["repositories"]]
+    assert listing == expected, f"unexpected repositories: {listing}"
+    assert [repo["rank"] for repo in result["repositories"]] == list(range(1, len(expected) + 1))
+
+
+def check_per_repo_topics(result, fixture):
+    topics, total = result
+    search = fixture["/search/repositories"]
+    assert topics == [repo["topics"][:5] for repo in search["items"][:10]], f"unexpected topics: {topics}"
+    assert total == search["total_count"], f"unexpected total: {total}"
+
+
+def check_search(result, fixture):
+    result = json.loads(result)
+    search = fixture["/search/repositories"]
+    check_listing(result, expected_listing(search["items"], 10))
+    assert result["total_found"] == search["total_count"], f"unexpected total: {result['total_found']}"
+
+
+def check_repository_info(result, fixture):
+    result = json.loads(result)
+    assert "error" not in result, result["error"]
+    repo = fixture["/repos/microsoft/vscode"]
+    assert result["name"] == repo["full_name"], f"unexpected name: {result['name']}"
+    assert result["stars"] == repo["stargazers_count"], f"unexpected stars: {result['stars']}"
+    assert result["topics"] == repo["topics"][:10], f"unexpected topics: {result['topics']}"
+
+
+def check_my_repositories(result, fixture):
+    result = json.loads(result)
+    check_listing(result, expected_listing(fixture["/user/repos"], 10))
+    user = fixture["/user"]
+    assert result["username"] == user["login"], f"unexpected username: {result['username']}"
+    assert result["total_repos"] == user["public_repos"], f"unexpected total: {result['total_repos']}"
+
+
+def main():
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        GitHubStubHandler.fixture = json.load(f)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GitHubStubHandler)
+    GitHubStubHandler.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    GitHubTools = load_github_tools()
+    tools = GitHubTools("fixture-token")
+    tools.github = Github(auth=Auth.Token("fixture-token"), base_url=GitHubStubHandler.base_url)
+
+    cases = [
+        ("per-repo get_topics (10 results)", lambda: per_repo_topics_listing(tools.github, "machine learning", 10),
+         check_per_repo_topics),
+        ("search_repositories (10 results)", lambda: tools.search_repositories("machine learning", max_results=10),
+         check_search),
+        ("get_repository_info", lambda: tools.get_repository_info("microsoft/vscode"), check_repository_info),
+        ("get_my_repositories (10 results)", lambda: tools.get_my_repositories(max_results=10),
+         check_my_repositories),
+    ]
+
+    print("=" * 60)
+    print("GitHub tool request counts (fixture-backed stub server)")
+    print("=" * 60)
+
+    try:
+        for name, call, check in cases:
+            result, count = count_requests(call)
+            check(result, GitHubStubHandler.fixture)
+            print(f"   {name:<36} {count:>3} requests  (result checked)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+GitHub Tool Cache
+TTL + LRU response cache for the read-only GitHubTools operations.
+
+Repeated questions within a conversation are answered from memory instead of
+spending latency and rate limit on identical GitHub API calls.
+"""
+
+import os
+import time
+import json
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# Default time-to-live per tool, in seconds
+DEFAULT_TOOL_TTLS = {
+    "search_repositories": 300,
+    "get_repository_info": 120,
+    "get_my_repositories": 60,
+    "get_trending_languages": 3600,
+}
+
+
+class TTLLRUCache:
+    """In-memory cache bounded by entry count and total value size, with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        """Store a value for ttl seconds, evicting least recently used entries as needed."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+class ToolCache:
+    """Per-tool caching policy with hit/miss counters in front of a pluggable backend."""
+
+    def __init__(self, backend=None, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 60):
+        """
+        Initialize the tool cache.
+
+        Args:
+            backend: Object with get(key), set(key, value, ttl) and clear() (default: TTLLRUCache)
+            ttls: Per-tool TTL overrides in seconds; a TTL of 0 disables caching for that tool
+            default_ttl: TTL for tools without an explicit entry
+        """
+        self.backend = backend if backend is not None else TTLLRUCache()
+        self.ttls = dict(DEFAULT_TOOL_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["ToolCache"]:
+        """
+        Build a cache from environment variables, or return None when disabled.
+
+        GITHUB_CACHE_ENABLED, GITHUB_CACHE_MAX_ENTRIES, GITHUB_CACHE_MAX_BYTES and
+        GITHUB_CACHE_TTLS (e.g. 'search_repositories=300,get_repository_info=120').
+        """
+        if os.getenv('GITHUB_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+
+        ttls = {}
+        for item in os.getenv('GITHUB_CACHE_TTLS', '').split(','):
+            if '=' in item:
+                name, ttl = item.split('=', 1)
+                ttls[name.strip()] = float(ttl)
+
+        backend = TTLLRUCache(
+            max_entries=int(os.getenv('GITHUB_CACHE_MAX_ENTRIES', '256')),
+            max_bytes=int(os.getenv('GITHUB_CACHE_MAX_BYTES', str(4 * 1024 * 1024)))
+        )
+        return cls(backend=backend, ttls=ttls)
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: dict) -> str:
+        """Build a cache key from the tool name and normalized arguments."""
+        normalized = {
+            name: " ".join(value.split()).lower() if isinstance(value, str) else value
+            for name, value in arguments.items()
+        }
+        return f"{tool_name}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+    def get_or_call(self, tool_name: str, arguments: dict, call: Callable[[], str]) -> str:
+        """
+        Return a cached tool result, or run the call and cache a successful result.
+
+        Args:
+            tool_name: Name of the tool being called
+            arguments: Bound call arguments, including defaults
+            call: Zero-argument callable that performs the real GitHub request
+
+        Returns:
+            JSON string produced by the tool
+        """
+        ttl = self.ttls.get(tool_name, self.default_ttl)
+        if ttl <= 0:
+            return call()
+
+        key = self.make_key(tool_name, arguments)
+        cached = self.backend.get(key)
+        if cached is not None:
+            self._count(self.hits, tool_name)
+            return cached
+
+        self._count(self.misses, tool_name)
+        result = call()
+
+        # Errors (rate limits, transient failures) must not be replayed from cache
+        if not result.startswith('{"error"'):
+            self.backend.set(key, result, ttl)
+
+        return result
+
+    def _count(self, counter: Dict[str, int], tool_name: str):
+        with self._lock:
+            counter[tool_name] = counter.get(tool_name, 0) + 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters per tool and overall."""
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "per_tool": {
+                name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)}
+                for name in sorted(set(self.hits) | set(self.misses))
+            },
+            "entries": len(self.backend) if hasattr(self.backend, "__len__") else None,
+        }
+
+
+def cached_tool(tool_name: str):
+    """
+    Decorate a GitHubTools method so its result goes through `self.cache` when one is set.
+
+    Args:
+        tool_name: Cache policy name for the decorated tool
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self, "cache", None)
+            if cache is None:
+                return method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(list(bound.arguments.items())[1:])
+            return cache.get_or_call(tool_name, arguments, lambda: method(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
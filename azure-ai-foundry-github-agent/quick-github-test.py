@@ -47,8 +47,8 @@ def test_github_token():
             core = rate_limit.core
             search = rate_limit.search
             print(f"\n📈 API Rate Limit:")
-            print(f"   Core: {core.remaining}/{core.limit}")
-            print(f"   Search: {search.remaining}/{search.limit}")
+            print(f"   Core: {core.remaining}/{core.limit} (resets {core.reset.isoformat()})")
+            print(f"   Search: {search.remaining}/{search.limit} (resets {search.reset.isoformat()})")
         except Exception as rate_error:
             print(f"\n📈 API Rate Limit: (Info unavailable - {str(rate_error)})")
         
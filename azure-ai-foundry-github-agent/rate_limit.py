@@ -0,0 +1,236 @@
+"""
+GitHub Rate Limit Scheduler
+Token-bucket scheduler that tracks the GitHub `core` and `search` rate limits separately.
+
+Every request takes a token from its bucket first. When a bucket is empty, the call
+waits for the bucket's reset time instead of being rejected with a 403, as long as the
+reset is at most max_wait seconds away; a longer wait raises RateLimitExceeded. Waits
+and rejections are reported through metrics().
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of waiting when a bucket resets later than the scheduler's max_wait."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"GitHub '{name}' rate limit exhausted; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class RateLimitBucket:
+    """Known state of one GitHub rate-limit resource."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.blocked_until = 0.0
+
+
+class RateLimitScheduler:
+    """Shared scheduler for every GitHub call made by the agent."""
+
+    def __init__(self, reserve: int = 0, max_wait: Optional[float] = 60.0, resync_interval: float = 60.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            reserve: Tokens per bucket held back for calls made outside the scheduler
+            max_wait: Longest a call waits for a reset before RateLimitExceeded (None: no cap)
+            resync_interval: Seconds between refreshes from GET /rate_limit (see resync_from_github)
+        """
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.resync_interval = resync_interval
+        self.buckets: Dict[str, RateLimitBucket] = {name: RateLimitBucket(name) for name in ("core", "search")}
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.rejections = 0
+        self.last_sync = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RateLimitScheduler":
+        """Build a scheduler from the GITHUB_RATE_LIMIT_* environment variables."""
+        max_wait = float(os.getenv('GITHUB_RATE_LIMIT_MAX_WAIT', '60'))
+        return cls(
+            reserve=int(os.getenv('GITHUB_RATE_LIMIT_RESERVE', '0')),
+            max_wait=max_wait if max_wait >= 0 else None,
+            resync_interval=float(os.getenv('GITHUB_RATE_LIMIT_RESYNC', '60'))
+        )
+
+    def _bucket(self, name: str) -> RateLimitBucket:
+        if name not in self.buckets:
+            self.buckets[name] = RateLimitBucket(name)
+        return self.buckets[name]
+
+    def _reserve(self, name: str, tokens: int) -> float:
+        """Take tokens if available; otherwise return the seconds to wait. Caller holds the lock."""
+        bucket = self._bucket(name)
+        now = time.time()
+
+        if bucket.blocked_until > now:
+            return bucket.blocked_until - now
+        if bucket.remaining is None:
+            return 0
+
+        if bucket.reset_at is not None and now >= bucket.reset_at:
+            bucket.remaining = bucket.limit
+            bucket.reset_at = None
+
+        if bucket.remaining - tokens >= self.reserve:
+            bucket.remaining -= tokens
+            return 0
+
+        return max(bucket.reset_at - now, 0.05) if bucket.reset_at else 1.0
+
+    def acquire(self, name: str = "core", tokens: int = 1) -> float:
+        """
+        Block until the bucket has tokens for the call.
+
+        Args:
+            name: Rate-limit resource ('core' or 'search')
+            tokens: Number of requests the call will make
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the total wait would exceed max_wait
+        """
+        start = time.monotonic()
+        delayed = False
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._reserve(name, tokens)
+                    if delay > 0 and self.max_wait is not None and \
+                            time.monotonic() - start + delay > self.max_wait:
+                        self.rejections += 1
+                        raise RateLimitExceeded(name, delay)
+                if delay <= 0:
+                    break
+                delayed = True
+                time.sleep(delay)
+        finally:
+            waited = time.monotonic() - start
+            with self._lock:
+                self.queue_depth -= 1
+                if delayed:
+                    self.waits += 1
+                    self.total_wait += waited
+        return waited
+
+    def update(self, name: str, headers: dict, status: int = 200) -> bool:
+        """
+        Refresh a bucket from response headers.
+
+        Args:
+            name: Bucket the request was charged to
+            headers: Response headers (X-RateLimit-* and Retry-After)
+            status: HTTP status code of the response
+
+        Returns:
+            True when the response was a rate-limit rejection worth retrying
+        """
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+
+        with self._lock:
+            bucket = self._bucket(headers.get('x-ratelimit-resource') or name)
+            if headers.get('x-ratelimit-limit') is not None:
+                bucket.limit = int(headers['x-ratelimit-limit'])
+                bucket.remaining = int(headers['x-ratelimit-remaining'])
+                bucket.reset_at = float(headers['x-ratelimit-reset'])
+
+            if status not in (403, 429):
+                return False
+
+            # Secondary (abuse) rate limits come with Retry-After instead of an empty bucket
+            retry_after = headers.get('retry-after')
+            if retry_after is not None:
+                bucket.blocked_until = time.time() + float(retry_after)
+                return True
+
+            return bucket.remaining == 0
+
+    def update_from_github(self, name: str, github):
+        """
+        Refresh a bucket from the X-RateLimit-* headers of a PyGithub client's last response.
+
+        Args:
+            name: Bucket the last request was charged to
+            github: PyGithub client that made the request
+        """
+        # Github.rate_limiting calls GET /rate_limit when no response carried the headers yet;
+        # the requester holds the same values without that extra request
+        requester = getattr(github, "requester", None)
+        if requester is not None:
+            remaining, limit = requester.rate_limiting
+            reset_at = requester.rate_limiting_resettime
+        else:
+            remaining, limit = github.rate_limiting
+            reset_at = github.rate_limiting_resettime
+        if limit < 0 or not reset_at:
+            return
+
+        with self._lock:
+            bucket = self._bucket(name)
+            # PyGithub keeps only the latest response's values, whichever bucket it was charged to.
+            # core and search have different limits, so a mismatch means another thread's call
+            # landed in between and the values belong to the other bucket.
+            if bucket.limit is not None and bucket.limit != limit:
+                return
+            bucket.limit = limit
+            bucket.remaining = remaining
+            bucket.reset_at = float(reset_at)
+
+    def needs_resync(self) -> bool:
+        """True when the buckets have not been refreshed within resync_interval."""
+        return time.time() - self.last_sync >= self.resync_interval
+
+    def resync_from_github(self, github):
+        """
+        Refresh both buckets from GET /rate_limit, which does not count against the quota.
+
+        Args:
+            github: Authenticated PyGithub client
+        """
+        # Count failed attempts too, so an unreachable endpoint is not retried on every call
+        self.last_sync = time.time()
+        overview = github.get_rate_limit()
+        resources = getattr(overview, "resources", overview)
+
+        with self._lock:
+            for name in ("core", "search"):
+                rate = getattr(resources, name)
+                bucket = self._bucket(name)
+                bucket.limit = rate.limit
+                bucket.remaining = rate.remaining
+                bucket.reset_at = rate.reset.timestamp()
+
+    def metrics(self) -> dict:
+        """Return queue depth, wait time, rejections and the last known state of each bucket."""
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "waits": self.waits,
+                "total_wait_seconds": round(self.total_wait, 3),
+                "rejections": self.rejections,
+                "buckets": {
+                    name: {"limit": bucket.limit, "remaining": bucket.remaining, "reset_at": bucket.reset_at}
+                    for name, bucket in self.buckets.items()
+                },
+            }
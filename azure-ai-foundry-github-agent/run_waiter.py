@@ -0,0 +1,136 @@
+"""
+Run Waiter
+Waits for Azure AI agent runs to leave the queued/in_progress states.
+
+Two modes return the same ThreadRun object:
+- poll: calls runs.get with jittered exponential backoff starting in the tens of milliseconds
+- stream: consumes the streaming run-event API and returns the last run event seen
+"""
+
+import os
+import asyncio
+import random
+from functools import partial
+from typing import Callable, Optional
+
+# Statuses that mean the service is still working on the run
+ACTIVE_RUN_STATUSES = ("queued", "in_progress", "cancelling")
+
+
+class RunWaiter:
+    """Adaptive replacement for a fixed `asyncio.sleep(1)` polling loop."""
+
+    def __init__(
+        self,
+        get_run: Callable,
+        stream_run: Optional[Callable] = None,
+        mode: Optional[str] = None,
+        initial_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        multiplier: float = 1.6,
+        jitter: float = 0.25
+    ):
+        """
+        Initialize the waiter.
+
+        Args:
+            get_run: Callable taking (thread_id=, run_id=) and returning the current run
+            stream_run: Optional callable taking (thread_id, agent_id) and returning a
+                context manager that yields run events
+            mode: 'poll' or 'stream' (default: RUN_WAIT_MODE env var, else 'poll')
+            initial_delay: First poll delay in seconds (default: RUN_POLL_INITIAL_DELAY or 0.05)
+            max_delay: Upper bound for the poll delay in seconds (default: RUN_POLL_MAX_DELAY or 2.0)
+            multiplier: Backoff growth factor applied after every poll
+            jitter: Fraction of random spread applied to each delay
+        """
+        self.get_run = get_run
+        self.stream_run = stream_run
+        self.mode = (mode or os.getenv('RUN_WAIT_MODE', 'poll')).lower()
+        self.initial_delay = initial_delay if initial_delay is not None else float(os.getenv('RUN_POLL_INITIAL_DELAY', '0.05'))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv('RUN_POLL_MAX_DELAY', '2.0'))
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.polls = 0
+
+    @classmethod
+    def for_agents_client(cls, agents, **kwargs) -> "RunWaiter":
+        """
+        Build a waiter from a project client's `agents` operations.
+
+        Supports both the `agents.runs.*` layout and the older flat `agents.get_run` layout.
+        """
+        runs = getattr(agents, "runs", None)
+        if runs is not None:
+            stream = getattr(runs, "stream", None)
+            stream_run = (lambda thread_id, agent_id: stream(thread_id=thread_id, agent_id=agent_id)) if stream else None
+            return cls(get_run=runs.get, stream_run=stream_run, **kwargs)
+
+        create_stream = getattr(agents, "create_stream", None)
+        stream_run = (lambda thread_id, agent_id: create_stream(thread_id=thread_id, assistant_id=agent_id)) if create_stream else None
+        return cls(get_run=agents.get_run, stream_run=stream_run, **kwargs)
+
+    @property
+    def can_stream(self) -> bool:
+        """True when streaming mode is selected and the SDK exposes a run stream."""
+        return self.mode == "stream" and self.stream_run is not None
+
+    async def wait(self, thread_id: str, run):
+        """
+        Poll a run until it is no longer queued or in progress.
+
+        Args:
+            thread_id: Thread the run belongs to
+            run: Run object returned by create/submit_tool_outputs
+
+        Returns:
+            The latest run object (completed, failed, requires_action, ...)
+        """
+        loop = asyncio.get_running_loop()
+        delay = self.initial_delay
+
+        while run.status in ACTIVE_RUN_STATUSES:
+            await asyncio.sleep(delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+            # The SDK call is blocking; keep it off the event loop
+            run = await loop.run_in_executor(
+                None, partial(self.get_run, thread_id=thread_id, run_id=run.id)
+            )
+            self.polls += 1
+            delay = min(delay * self.multiplier, self.max_delay)
+
+        return run
+
+    async def stream(self, thread_id: str, agent_id: str):
+        """
+        Create a run through the streaming API and wait for it to settle.
+
+        Args:
+            thread_id: Thread to run
+            agent_id: Agent to run on the thread
+
+        Returns:
+            The last run object received from the event stream
+        """
+        if self.stream_run is None:
+            raise RuntimeError("Streaming runs are not supported by this SDK version")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._consume_stream, thread_id, agent_id)
+
+    def _consume_stream(self, thread_id: str, agent_id: str):
+        """Read run events until the run leaves the active states."""
+        last_run = None
+
+        with self.stream_run(thread_id, agent_id) as stream:
+            for event in stream:
+                # Events arrive as (event_type, event_data, func_return) tuples
+                event_data = event[1] if isinstance(event, tuple) else event
+
+                if getattr(event_data, "object", None) == "thread.run":
+                    last_run = event_data
+                    if last_run.status not in ACTIVE_RUN_STATUSES:
+                        break
+
+        if last_run is None:
+            raise RuntimeError("Run stream ended without any run events")
+
+        return last_run
@@ -10,6 +10,7 @@ from azure.ai.projects import AIProjectClient
 from azure.ai.projects.models import ConnectionType
 from azure.identity import DefaultAzureCredential
 from azure.ai.inference.prompts import PromptTemplate
+from run_waiter import RunWaiter
 
 async def test_mcp_github_chat():
     """Test MCP server connection and chat with GitHub data."""
@@ -113,12 +114,8 @@ async def test_mcp_github_chat():
         
         # Wait for completion
         print("⏳ Waiting for response...")
-        while run.status in ["queued", "in_progress"]:
-            await asyncio.sleep(1)
-            run = project_client.agents.get_run(
-                thread_id=thread.id,
-                run_id=run.id
-            )
+        run_waiter = RunWaiter(get_run=project_client.agents.get_run, mode="poll")
+        run = await run_waiter.wait(thread.id, run)
         
         if run.status == "completed":
             # Get messages